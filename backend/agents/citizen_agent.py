@@ -1,54 +1,23 @@
-import os
+import logging
+import orjson
+import json_repair
+from datetime import date
+from typing import List, Tuple
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, ValidationError, validator
+from agents.keywords import compile_keywords
+from agents.llm import MAX_USER_MESSAGE_CHARS
+from agents.runner import AgentRunner
+from agents.weather_context import bucket_weather, weather_context_block
 
 load_dotenv()
 
-def generate_citizen_response(user_message: str, weather: dict, return_json: bool = False):
-    """
-    Generate structured, weather-aware health advice for authenticated citizens
-    
-    This agent provides comprehensive health guidance with 10 mandatory sections.
-    Uses LangChain's ChatGoogleGenerativeAI wrapper for consistent API handling
-    and includes emergency symptom detection.
-    
-    Args:
-        user_message: User's health question or symptom description
-        weather: Dictionary containing temperature, humidity, and description
-        return_json: If True, returns structured JSON; if False, returns markdown text
-    
-    Returns:
-        dict or str: Structured health advice with weather-specific recommendations
-    """
-    print("CitizenAI: request received")
-    print(f"CitizenAI: weather data - {weather}")
-    print(f"CitizenAI: return_json mode - {return_json}")
-    
-    # Check for critical symptoms that require emergency response only
-    critical_symptoms = [
-        "chest pain", "difficulty breathing", "unconscious", "bleeding",
-        "high fever", "fainting", "can't breathe", "heart attack", "stroke"
-    ]
-    
-    user_message_lower = user_message.lower()
-    if any(symptom in user_message_lower for symptom in critical_symptoms):
-        print("Citizen Agent: Critical symptoms detected - returning emergency response")
-        return "🚨 EMERGENCY: Call emergency services immediately (911). Do not delay medical attention."
-    
-    # Initialize ChatGoogleGenerativeAI model for comprehensive health advice
-    # Temperature 0.7 provides balanced creativity while maintaining medical accuracy
-    model = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=os.getenv("GOOGLE_API_KEY"),
-        temperature=0.7,
-        convert_system_message_to_human=True,
-    )
-    
-    # SystemMessage defines the citizen agent's structured health advisory behavior
-    # This creates a comprehensive health assistant with mandatory 10-section format
-    if return_json:
-        system_message = SystemMessage(content="""
+logger = logging.getLogger(__name__)
+
+# Static system prompts, kept as the exact prompt prefix. All per-request data
+# (user message, weather) goes into the human message after it, so the
+# provider-side prefix cache can reuse the processed system tokens.
+CITIZEN_JSON_SYSTEM_PROMPT = """
 You are 'SurgeSense Citizen Health Guide', a detailed health and wellness assistant.
 You provide comprehensive, weather-aware health guidance in STRICT JSON format.
 
@@ -110,9 +79,9 @@ CRITICAL RULES:
 - Base ALL advice on weather: temperature, humidity, conditions
 - Keep weatherImpact and dailySummary brief (2-3 sentences max)
 - Each section should have 3-5 clear, actionable points
-""")
-    else:
-        system_message = SystemMessage(content="""
+"""
+
+CITIZEN_TEXT_SYSTEM_PROMPT = """
 You are 'SurgeSense Citizen Health Guide', a detailed health and wellness assistant for authenticated citizens.
 You ALWAYS provide comprehensive, section-wise health guidance based on current weather conditions.
 
@@ -199,125 +168,243 @@ FORMATTING RULES:
 - Be detailed but practical - focus on actionable steps
 - Friendly, supportive tone but professional
 - NO medical diagnoses or prescription medications
-""")
+"""
+
+class CitizenHealthPlan(BaseModel):
+    """Schema of the JSON-mode citizen plan - mirrors the keys in the system prompt"""
+    weatherImpact: str = ""
+    dietPlan: List[str] = []
+    avoidThese: List[str] = []
+    ayurvedicTips: List[str] = []
+    hydrationPlan: List[str] = []
+    sleepGuidance: List[str] = []
+    clothingSuggestions: List[str] = []
+    outdoorSafety: List[str] = []
+    mindBodyWellness: List[str] = []
+    dailySummary: str = ""
+
+    @validator(
+        "dietPlan", "avoidThese", "ayurvedicTips", "hydrationPlan", "sleepGuidance",
+        "clothingSuggestions", "outdoorSafety", "mindBodyWellness", pre=True
+    )
+    def single_point_as_list(cls, value):
+        # The model occasionally returns one bullet as a bare string
+        return [value] if isinstance(value, str) else value
+
+# Variety across days without randomizing every prompt: the focus area is a
+# pure function of the date, so all requests on the same day share one prompt
+# prefix and stay cacheable. Trade-off: variety is per day, not per request.
+FOCUS_AREAS = (
+    "immunity boosting", "energy optimization", "stress management", "digestive health"
+)
+
+def _daily_focus_area(day: date) -> str:
+    """Focus area for the given day, rotating deterministically through FOCUS_AREAS"""
+    return FOCUS_AREAS[day.toordinal() % len(FOCUS_AREAS)]
+
+# Human message template, bound once; only the three fields change per call
+_CITIZEN_HUMAN_TMPL = """
+IMPORTANT: Create a PERSONALIZED response with ALL 10 mandatory sections.
+Customize every recommendation based on:
+1. The user's specific profile, age, gender, health conditions, and preferences mentioned
+2. The current weather and air quality given in the WEATHER block below
+3. Make each recommendation specific to the user's individual needs
+
+Avoid generic responses. Include specific quantities, timings, and personalized advice.
+
+Today's Focus Area: {focus_area}
+
+Current Environmental Data:
+{weather_block}
+
+User's Personalized Health Request: "{user_message}"
+""".format_map
+
+CRITICAL_SYMPTOMS = (
+    "chest pain", "difficulty breathing", "unconscious", "bleeding",
+    "high fever", "fainting", "can't breathe", "heart attack", "stroke"
+)
+
+# Single compiled alternation - one pass over the message for all symptoms
+CRITICAL_SYMPTOMS_RE = compile_keywords(CRITICAL_SYMPTOMS)
+
+EMERGENCY_RESPONSE = "🚨 EMERGENCY: Call emergency services immediately (911). Do not delay medical attention."
+
+# Upper bound on concurrent Gemini calls for batch requests; LangChain's
+# default max_concurrency would otherwise be unbounded or serial by accident
+BATCH_MAX_CONCURRENCY = 10
+
+# The system prompt defines the citizen agent's structured health advisory
+# behavior (mandatory 10-section format). Temperature 0.7 provides balanced
+# creativity while maintaining medical accuracy.
+AgentRunner.register("citizen_json", CITIZEN_JSON_SYSTEM_PROMPT, temperature=0.7, convert_system=True)
+AgentRunner.register("citizen_md", CITIZEN_TEXT_SYSTEM_PROMPT, temperature=0.7, convert_system=True)
+
+def _citizen_runner(return_json: bool) -> AgentRunner:
+    return AgentRunner("citizen_json" if return_json else "citizen_md")
+
+def _build_citizen_content(user_message: str, weather: dict) -> str:
+    """Render the human message for one citizen request"""
+    # Static instructions first, then the delimited weather block, then the
+    # user's request last so only the tail of the prompt changes per request
+    weather_block = weather_context_block(*bucket_weather(weather))
     
-    # HumanMessage contains the user's health query and weather context
-    # Weather integration allows for climate-specific health recommendations
+    return _CITIZEN_HUMAN_TMPL({
+        "focus_area": _daily_focus_area(date.today()),
+        "weather_block": weather_block,
+        "user_message": user_message[:MAX_USER_MESSAGE_CHARS],
+    })
+
+def _parse_citizen_content(content: str, weather: dict, return_json: bool):
+    """Turn raw model output into the response shape expected by the routes"""
     temp = weather.get('temperature', 25)
     humidity = weather.get('humidity', 60)
     conditions = weather.get('description', 'moderate')
     aqi = weather.get('aqi', 50)
     aqi_category = weather.get('aqi_category', 'Good')
     
-    # Add randomization to prevent identical responses
-    import random
-    time_variations = [
-        "morning routine", "daily schedule", "today's plan", "wellness routine"
-    ]
-    focus_areas = [
-        "immunity boosting", "energy optimization", "stress management", "digestive health"
-    ]
+    if not return_json:
+        logger.debug("CitizenAI: Response preview - %.200s...", content)
+        return content
     
-    selected_time = random.choice(time_variations)
-    selected_focus = random.choice(focus_areas)
+    # Parse JSON response - orjson first, json_repair for slightly malformed output
+    cleaned = content.encode().strip()
+    cleaned = cleaned.removeprefix(b"```json").removeprefix(b"```").removesuffix(b"```").strip()
+    try:
+        parsed = orjson.loads(cleaned)
+    except orjson.JSONDecodeError as je:
+        logger.debug("CitizenAI: JSON parse error - %s", je)
+        parsed = json_repair.loads(cleaned.decode())
     
-    human_message = HumanMessage(content=f"""
-User's Personalized Health Request: "{user_message}"
+    # Validate against the plan schema so callers always get all 10 keys
+    if isinstance(parsed, dict) and parsed:
+        try:
+            # Fields are flat lists/strings, so a shallow copy is enough - .dict() would re-walk them
+            plan = dict(CitizenHealthPlan.parse_obj(parsed))
+            logger.debug("CitizenAI: Successfully parsed JSON response")
+            return plan
+        except ValidationError as ve:
+            logger.warning("CitizenAI: Response failed schema validation - %s", ve)
+    
+    logger.warning("CitizenAI: Unusable JSON response - %.500s", content)
+    # Return fallback structure
+    # Generate a basic personalized fallback based on weather
+    fallback_diet = [
+        f"Breakfast: Warm oats with seasonal fruits (temp: {temp}°C)",
+        f"Lunch: Light meal suitable for {conditions} weather",
+        f"Dinner: Balanced meal with hydration focus (humidity: {humidity}%)"
+    ]
+    
+    return {
+        "weatherImpact": f"Current weather ({temp}°C, {humidity}% humidity) requires specific health adjustments. Please try generating again.",
+        "dietPlan": fallback_diet,
+        "avoidThese": [f"Heavy foods in {conditions} weather", "Excessive sun exposure"],
+        "ayurvedicTips": ["Stay hydrated with herbal teas", "Practice breathing exercises"],
+        "hydrationPlan": [f"Increase water intake due to {humidity}% humidity"],
+        "sleepGuidance": ["Adjust sleep environment for current weather"],
+        "clothingSuggestions": [f"Light clothing for {temp}°C temperature"],
+        "outdoorSafety": [f"Be cautious with AQI at {aqi} ({aqi_category})"],
+        "mindBodyWellness": ["Weather-appropriate meditation and yoga"],
+        "dailySummary": f"Focus on weather adaptation for {conditions} conditions. Please regenerate for detailed plan."
+    }
 
-Current Environmental Data:
-- Temperature: {temp}°C
-- Humidity: {humidity}%
-- Weather Conditions: {conditions}
-- Air Quality Index: {aqi} ({aqi_category})
-- Focus Area: {selected_focus}
-- Schedule Type: {selected_time}
-
-IMPORTANT: Create a UNIQUE, PERSONALIZED response with ALL 10 mandatory sections.
-Customize every recommendation based on:
-1. The user's specific profile, age, gender, health conditions, and preferences mentioned
-2. Current weather and air quality (temp {temp}°C, humidity {humidity}%, AQI {aqi})
-3. Focus on {selected_focus} and create a {selected_time}
-4. Make each recommendation specific to the user's individual needs
+def _citizen_error_fallback(weather: dict) -> dict:
+    """Basic weather-aware plan returned when the model call itself fails"""
+    temp = weather.get('temperature', 25)
+    humidity = weather.get('humidity', 60)
+    return {
+        "weatherImpact": f"Weather conditions: {temp}°C, {humidity}% humidity. Health adjustments needed.",
+        "dietPlan": ["Seasonal, weather-appropriate meals recommended"],
+        "avoidThese": ["Foods unsuitable for current weather conditions"],
+        "ayurvedicTips": ["Traditional remedies for current climate"],
+        "hydrationPlan": ["Weather-based hydration strategy needed"],
+        "sleepGuidance": ["Sleep adjustments for current conditions"],
+        "clothingSuggestions": [f"Appropriate attire for {temp}°C"],
+        "outdoorSafety": ["Weather-specific safety measures"],
+        "mindBodyWellness": ["Climate-adapted wellness practices"],
+        "dailySummary": "Personalized plan temporarily unavailable. Please try again."
+    }
 
-Generate FRESH, VARIED content - avoid generic responses. Include specific quantities, timings, and personalized advice.
-""")
+async def generate_citizen_response(user_message: str, weather: dict, return_json: bool = False):
+    """
+    Generate structured, weather-aware health advice for authenticated citizens
     
-    # Create message list for LangChain model invocation
-    # LangChain uses structured messages for proper prompt engineering
-    messages = [
-        system_message,
-        human_message
-    ]
+    This agent provides comprehensive health guidance with 10 mandatory sections.
+    Uses LangChain's ChatGoogleGenerativeAI wrapper for consistent API handling
+    and includes emergency symptom detection.
+    
+    Args:
+        user_message: User's health question or symptom description
+        weather: Dictionary containing temperature, humidity, and description
+        return_json: If True, returns structured JSON; if False, returns markdown text
+    
+    Returns:
+        dict or str: Structured health advice with weather-specific recommendations
+    """
+    logger.debug("CitizenAI: request received - weather=%s return_json=%s", weather, return_json)
+    
+    # Check for critical symptoms that require emergency response only
+    if CRITICAL_SYMPTOMS_RE.search(user_message.encode()):
+        logger.info("CitizenAI: Critical symptoms detected - returning emergency response")
+        return EMERGENCY_RESPONSE
+    
+    content = _build_citizen_content(user_message, weather)
     
     try:
-        print("CitizenAI: invoking Gemini model via LangChain")
-        print(f"CitizenAI: User message - {user_message[:100]}...")
-        print(f"CitizenAI: Weather context - Temp: {temp}°C, Humidity: {humidity}%, Conditions: {conditions}, AQI: {aqi}")
-        print(f"CitizenAI: Focus: {selected_focus}, Schedule: {selected_time}")
+        logger.debug("CitizenAI: invoking Gemini model - %.100s...", user_message)
         
-        # Invoke the model with structured messages
         # LangChain handles API communication and response parsing automatically
-        response = model.invoke(messages)
+        response_text = await _citizen_runner(return_json).run(content)
         
-        print("CitizenAI: model invoked successfully")
-        print(f"CitizenAI: Response length - {len(response.content)} characters")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("CitizenAI: model returned %d characters", len(response_text))
         
-        if return_json:
-            # Parse JSON response
-            import json
-            try:
-                # Clean response - remove markdown code blocks if present
-                content = response.content.strip()
-                if content.startswith('```json'):
-                    content = content[7:]
-                if content.startswith('```'):
-                    content = content[3:]
-                if content.endswith('```'):
-                    content = content[:-3]
-                content = content.strip()
-                
-                parsed = json.loads(content)
-                print(f"CitizenAI: Successfully parsed JSON response")
-                return parsed
-            except json.JSONDecodeError as je:
-                print(f"CitizenAI: JSON parse error - {je}")
-                print(f"CitizenAI: Raw response - {response.content[:500]}")
-                # Return fallback structure
-                # Generate a basic personalized fallback based on weather
-                fallback_diet = [
-                    f"Breakfast: Warm oats with seasonal fruits (temp: {temp}°C)",
-                    f"Lunch: Light meal suitable for {conditions} weather",
-                    f"Dinner: Balanced meal with hydration focus (humidity: {humidity}%)"
-                ]
-                
-                return {
-                    "weatherImpact": f"Current weather ({temp}°C, {humidity}% humidity) requires specific health adjustments. Please try generating again.",
-                    "dietPlan": fallback_diet,
-                    "avoidThese": [f"Heavy foods in {conditions} weather", "Excessive sun exposure"],
-                    "ayurvedicTips": ["Stay hydrated with herbal teas", "Practice breathing exercises"],
-                    "hydrationPlan": [f"Increase water intake due to {humidity}% humidity"],
-                    "sleepGuidance": ["Adjust sleep environment for current weather"],
-                    "clothingSuggestions": [f"Light clothing for {temp}°C temperature"],
-                    "outdoorSafety": [f"Be cautious with AQI at {aqi} ({aqi_category})"],
-                    "mindBodyWellness": ["Weather-appropriate meditation and yoga"],
-                    "dailySummary": f"Focus on weather adaptation for {conditions} conditions. Please regenerate for detailed plan."
-                }
-        else:
-            print(f"CitizenAI: Response preview - {response.content[:200]}...")
-            return response.content
+        return _parse_citizen_content(response_text, weather, return_json)
         
     except Exception as e:
-        print(f"CitizenAI: Error - {str(e)}")
+        logger.error("CitizenAI: Error - %s", e)
         # Return a basic weather-aware fallback instead of raising error
-        return {
-            "weatherImpact": f"Weather conditions: {temp}°C, {humidity}% humidity. Health adjustments needed.",
-            "dietPlan": ["Seasonal, weather-appropriate meals recommended"],
-            "avoidThese": ["Foods unsuitable for current weather conditions"],
-            "ayurvedicTips": ["Traditional remedies for current climate"],
-            "hydrationPlan": ["Weather-based hydration strategy needed"],
-            "sleepGuidance": ["Sleep adjustments for current conditions"],
-            "clothingSuggestions": [f"Appropriate attire for {temp}°C"],
-            "outdoorSafety": ["Weather-specific safety measures"],
-            "mindBodyWellness": ["Climate-adapted wellness practices"],
-            "dailySummary": "Personalized plan temporarily unavailable. Please try again."
-        }
+        return _citizen_error_fallback(weather)
+
+async def generate_citizen_responses_batch(items: List[Tuple[str, dict]], return_json: bool = True) -> list:
+    """
+    Generate citizen health plans for many (message, weather) pairs at once
+    
+    All non-emergency prompts are sent through a single `abatch` call with an
+    explicit max_concurrency, so K requests take about ceil(K / concurrency)
+    model round trips instead of K sequential ones.
+    
+    Args:
+        items: List of (user_message, weather) tuples
+        return_json: If True, each result is structured JSON; otherwise markdown text
+    
+    Returns:
+        list: One response per input item, in the same order
+    """
+    logger.debug("CitizenAI: batch request received - %d items", len(items))
+    
+    results = [None] * len(items)
+    pending = []
+    for index, (user_message, weather) in enumerate(items):
+        if CRITICAL_SYMPTOMS_RE.search(user_message.encode()):
+            results[index] = EMERGENCY_RESPONSE
+        else:
+            pending.append(index)
+    
+    if not pending:
+        return results
+    
+    responses = await _citizen_runner(return_json).run_batch(
+        [_build_citizen_content(*items[index]) for index in pending],
+        BATCH_MAX_CONCURRENCY
+    )
+    
+    for index, response in zip(pending, responses):
+        weather = items[index][1]
+        if isinstance(response, Exception):
+            logger.error("CitizenAI: Batch item %d error - %s", index, response)
+            results[index] = _citizen_error_fallback(weather)
+        else:
+            results[index] = _parse_citizen_content(response, weather, return_json)
+    
+    return results
@@ -1,35 +1,16 @@
-import os
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+import asyncio
+import logging
+from agents.llm import MAX_USER_MESSAGE_CHARS
+from agents.runner import AgentRunner
+from agents.weather_context import bucket_weather, weather_context_block
+from utils.weather_api import get_weather
+from utils.weather_aqi import fetch_aqi
+from utils.blocking import run_http
+from config.location import MUMBAI_LAT, MUMBAI_LON
 
-def generate_hospital_response(query: str):
-    print("Hospital agent started")
-    
-    # Get live weather and AQI data
-    try:
-        from utils.weather_api import get_weather
-        from utils.weather_aqi import get_air_quality, classify_aqi_us
-        
-        lat, lon = 19.0760, 72.8777  # Mumbai coordinates
-        weather_data = get_weather(lat, lon)
-        if not weather_data:
-            weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
-        
-        # Get AQI data
-        try:
-            aqi_data = get_air_quality(lat, lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-            aqi_category = classify_aqi_us(aqi_value)
-            weather_data['aqi'] = aqi_value
-            weather_data['aqi_category'] = aqi_category
-        except:
-            weather_data['aqi'] = 50
-            weather_data['aqi_category'] = 'Good'
-            
-    except:
-        weather_data = {"temperature": 25, "humidity": 60, "description": "moderate", "aqi": 50, "aqi_category": "Good"}
+logger = logging.getLogger(__name__)
 
-    system_prompt = """You are the SurgeSense Hospital Operations Intelligence Agent.
+HOSPITAL_SYSTEM_PROMPT = """You are the SurgeSense Hospital Operations Intelligence Agent.
 
 Your job is to analyze current weather conditions and predict operational healthcare needs.
 
@@ -64,20 +45,43 @@ RULES:
 4. Cold (<15°C) = respiratory infections
 5. Return ONLY valid JSON, no extra text"""
 
-    model = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=os.getenv("GOOGLE_API_KEY")
-    )
+_HOSPITAL_HUMAN_TMPL = "Current Weather Data:\n{weather_block}\n\nRequest: {request}".format_map
+
+AgentRunner.register("hospital", HOSPITAL_SYSTEM_PROMPT, temperature=0.7)
+
+async def generate_hospital_response(query: str):
+    logger.debug("Hospital agent started")
+    
+    # Get live weather and AQI data - both fetched concurrently
+    try:
+        lat, lon = MUMBAI_LAT, MUMBAI_LON
+        weather_data, (aqi_value, aqi_category) = await asyncio.gather(
+            run_http(get_weather, lat, lon),
+            fetch_aqi(lat, lon),
+            return_exceptions=True
+        )
+        if not weather_data or isinstance(weather_data, Exception):
+            weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
+        
+        weather_data['aqi'], weather_data['aqi_category'] = aqi_value, aqi_category
+            
+    except Exception:
+        weather_data = {"temperature": 25, "humidity": 60, "description": "moderate", "aqi": 50, "aqi_category": "Good"}
+
+    # Static system prompt first, then the delimited weather block, then the
+    # caller's query last so the prompt prefix is identical across requests
+    weather_block = weather_context_block(*bucket_weather(weather_data), location="Mumbai")
+    request = query or "Generate hospital recommendations based on this live weather and air quality data."
 
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=f"Current Weather Data: Temperature: {weather_data.get('temperature', 25)}°C, Humidity: {weather_data.get('humidity', 60)}%, Conditions: {weather_data.get('description', 'moderate')}, AQI: {weather_data.get('aqi', 50)} ({weather_data.get('aqi_category', 'Good')}). Location: Mumbai. Generate hospital recommendations based on this live weather and air quality data.")
-    ]
+    content = _HOSPITAL_HUMAN_TMPL({
+        "weather_block": weather_block,
+        "request": request[:MAX_USER_MESSAGE_CHARS],
+    })
 
     try:
-        res = model(messages)
-        print("Hospital AI response generated")
-        return res.content
+        response_text = await AgentRunner("hospital").run(content)
+        logger.debug("Hospital AI response generated")
+        return response_text
     except Exception as e:
-        print("Error:", e)
+        logger.error("Hospital AI: Error - %s", e)
         return {"error": "Agent failed"}
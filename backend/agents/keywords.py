@@ -0,0 +1,19 @@
+import re
+import re2
+
+def compile_keywords(keywords):
+    """
+    Compile a keyword list into one case-insensitive RE2 alternation over bytes
+
+    RE2 runs the union as a DFA in C with no backtracking, and matching raw
+    UTF-8 bytes with (?i) avoids building a lowered copy of every message.
+    Use as `pattern.search(text.encode())`.
+
+    Args:
+        keywords: Literal phrases to match anywhere in the text
+
+    Returns:
+        re2 pattern matching any of the keywords
+    """
+    alternation = "|".join(map(re.escape, keywords))
+    return re2.compile(("(?i)" + alternation).encode())
@@ -1,14 +1,71 @@
-import os
+import logging
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from agents.keywords import compile_keywords
+from agents.llm import MAX_USER_MESSAGE_CHARS
+from agents.runner import AgentRunner
+from utils.semantic_cache import SemanticCache
+from utils.blocking import run_llm
+from config.location import MUMBAI_LAT, MUMBAI_LON
 
 load_dotenv()
 
-def generate_landing_response(
+logger = logging.getLogger(__name__)
+
+# Keyword tables are built once at import; greetings are matched exactly
+GREETING_WORDS = frozenset(["hi", "hello", "hey", "hii", "hi!", "hello!", "hey!"])
+
+SERIOUS_SYMPTOMS = (
+    "chest pain", "difficulty breathing", "confusion", "high fever",
+    "severe bleeding", "fainting", "stroke", "heart attack", "can't breathe",
+    "unconscious", "severe headache", "numbness", "paralysis"
+)
+
+WEATHER_KEYWORDS = (
+    "weather", "temperature", "heat", "cold", "humidity", "climate",
+    "outside", "hot", "warm", "cool", "sunny", "rainy", "windy"
+)
+
+# Each keyword group compiles to a single alternation, so a message is
+# scanned once per group instead of once per keyword
+SERIOUS_SYMPTOMS_RE = compile_keywords(SERIOUS_SYMPTOMS)
+WEATHER_KEYWORDS_RE = compile_keywords(WEATHER_KEYWORDS)
+
+# Landing traffic is dominated by a handful of near-duplicate wellness
+# questions, so answers are reused for semantically similar messages
+landing_cache = SemanticCache(threshold=0.92, max_entries=256, ttl_seconds=3600)
+
+# Very strict system rule: ALWAYS short answers
+LANDING_SYSTEM_PROMPT = """
+You are a friendly wellness assistant for the Landing Page.
+
+RULES (VERY IMPORTANT):
+- Always reply in plain text only.
+- Your response MUST be between 1 and 3 sentences.
+- Keep it under about 45–50 words.
+- No lists, no headings, no markdown, no numbered sections.
+- If the user asks for a big / detailed / full plan, give a very short summary in 2–3 sentences and say:
+  "If you want, I can share a detailed plan."
+- Focus on simple guidance about sleep, skincare, hydration, stress, and general wellbeing.
+- If the user's question mentions weather or climate, you may add one short weather-related tip.
+- If the message sounds dangerous or life-threatening, reply in ONE sentence telling them to seek proper medical help or nearby clinics.
+"""
+
+_LANDING_WEATHER_HUMAN_TMPL = """
+User message: {message}
+User location: {lat}, {lon}
+
+Respond following the rules: 1–3 short sentences, very concise, friendly tone.
+Include at most one brief weather-related tip if helpful.
+""".format_map
+
+_LANDING_HUMAN_TMPL = "User message: {message}\n\nRespond in 1–3 short sentences only. Be concise and friendly.".format_map
+
+AgentRunner.register("landing", LANDING_SYSTEM_PROMPT, temperature=0.6, convert_system=True)
+
+async def generate_landing_response(
     message: str = "Give me today's complete health plan",
-    lat: float = 19.0760,
-    lon: float = 72.8777
+    lat: float = MUMBAI_LAT,
+    lon: float = MUMBAI_LON
 ):
     """
     Generate short, friendly wellness advice for landing page users.
@@ -25,90 +82,59 @@ def generate_landing_response(
     Returns:
         str: Short, casual wellness advice
     """
-    print("Landing AI request received")
-    print(f"Landing AI: processing message - '{message}'")
+    logger.debug("Landing AI: processing message - %r", message)
 
     message_lower = message.lower().strip()
 
     # 0️⃣ Handle simple greetings instantly (NO LLM CALL)
-    greeting_words = ["hi", "hello", "hey", "hii", "hi!", "hello!", "hey!"]
-    if message_lower in greeting_words:
-        print("Landing AI: Greeting detected")
+    if message_lower in GREETING_WORDS:
+        logger.debug("Landing AI: Greeting detected")
         return "Hi! How can I help you today?"
 
     # 1️⃣ Check for serious symptoms that need medical attention
-    serious_symptoms = [
-        "chest pain", "difficulty breathing", "confusion", "high fever",
-        "severe bleeding", "fainting", "stroke", "heart attack", "can't breathe",
-        "unconscious", "severe headache", "numbness", "paralysis"
-    ]
-
-    if any(symptom in message_lower for symptom in serious_symptoms):
-        print("Landing AI: Serious symptoms detected")
+    message_bytes = message.encode()
+    if SERIOUS_SYMPTOMS_RE.search(message_bytes):
+        logger.info("Landing AI: Serious symptoms detected")
         return "Your symptoms sound serious. Please log in to get proper care and see nearby clinics."
 
     # 2️⃣ Check if user is asking about weather-related topics
-    weather_keywords = [
-        "weather", "temperature", "heat", "cold", "humidity", "climate",
-        "outside", "hot", "warm", "cool", "sunny", "rainy", "windy"
-    ]
-    is_weather_question = any(keyword in message_lower for keyword in weather_keywords)
-
-    print("Calling Gemini Flash")
-
-    model = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=os.getenv("GOOGLE_API_KEY"),
-        temperature=0.6,
-        convert_system_message_to_human=True,
+    is_weather_question = WEATHER_KEYWORDS_RE.search(message_bytes) is not None
+
+    # Weather-conditioned answers are only reused for nearby locations
+    cache_namespace = (
+        (True, round(lat, 1), round(lon, 1)) if is_weather_question and lat != 0 and lon != 0
+        else (False, None, None)
     )
+    cached_response = landing_cache.lookup_exact(cache_namespace, message_lower)
+    if cached_response is not None:
+        logger.debug("Landing AI: exact cache hit")
+        return cached_response
 
-    # 3️⃣ Very strict system rule: ALWAYS short answers
-    system_message = SystemMessage(
-        content="""
-You are a friendly wellness assistant for the Landing Page.
+    message_embedding = await run_llm(landing_cache.embed, message_lower)
+    cached_response = landing_cache.lookup(cache_namespace, message_embedding)
+    if cached_response is not None:
+        logger.debug("Landing AI: semantic cache hit")
+        return cached_response
 
-RULES (VERY IMPORTANT):
-- Always reply in plain text only.
-- Your response MUST be between 1 and 3 sentences.
-- Keep it under about 45–50 words.
-- No lists, no headings, no markdown, no numbered sections.
-- If the user asks for a big / detailed / full plan, give a very short summary in 2–3 sentences and say:
-  "If you want, I can share a detailed plan."
-- Focus on simple guidance about sleep, skincare, hydration, stress, and general wellbeing.
-- If the user's question mentions weather or climate, you may add one short weather-related tip.
-- If the message sounds dangerous or life-threatening, reply in ONE sentence telling them to seek proper medical help or nearby clinics.
-"""
-    )
+    logger.debug("Landing AI: calling Gemini Flash")
 
-    # 4️⃣ Build human message with optional weather context
+    # 3️⃣ Build human message with optional weather context
+    message = message[:MAX_USER_MESSAGE_CHARS]
     if is_weather_question and lat != 0 and lon != 0:
-        human_message = HumanMessage(
-            content=f"""
-User message: {message}
-User location: {lat}, {lon}
-
-Respond following the rules: 1–3 short sentences, very concise, friendly tone.
-Include at most one brief weather-related tip if helpful.
-"""
-        )
+        content = _LANDING_WEATHER_HUMAN_TMPL({"message": message, "lat": lat, "lon": lon})
     else:
-        human_message = HumanMessage(
-            content=(
-                "User message: "
-                + message
-                + "\n\nRespond in 1–3 short sentences only. Be concise and friendly."
-            )
-        )
-
-    messages = [system_message, human_message]
+        content = _LANDING_HUMAN_TMPL({"message": message})
 
     try:
-        response = model.invoke(messages)
-        print("Landing AI response generated")
-        return response.content.strip()
+        # LangChain is only imported inside the runner, so greetings and
+        # cache hits never pay the import cost
+        response = await AgentRunner("landing").run(content)
+        logger.debug("Landing AI response generated")
+        response_text = response.strip()
+        landing_cache.update(cache_namespace, message_lower, message_embedding, response_text)
+        return response_text
     except Exception as e:
-        print(f"Landing AI: Error - {str(e)}")
+        logger.error("Landing AI: Error - %s", e)
         return (
             "Hi! I'm here to help with quick wellness tips. "
             "Ask me about sleep, stress, skin, or healthy habits."
@@ -0,0 +1,35 @@
+import os
+from functools import lru_cache
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Longest user text forwarded to the model - keeps prompt size bounded
+MAX_USER_MESSAGE_CHARS = 1000
+
+@lru_cache(maxsize=8)
+def get_model(model: str = DEFAULT_MODEL, temperature: float = 0.7, convert_system: bool = False):
+    """
+    Shared ChatGoogleGenerativeAI instance per (model, temperature, convert_system)
+    
+    Every agent goes through here so requests reuse the same underlying
+    Gemini client and its warm connection instead of opening a new one per
+    call. The wrapper holds no per-request state, so sharing it across
+    threads and coroutines is safe.
+    
+    Args:
+        model: Gemini model name
+        temperature: Sampling temperature
+        convert_system: Fold the system message into the first human turn
+    
+    Returns:
+        ChatGoogleGenerativeAI: Cached chat model
+    """
+    # Imported lazily to keep LangChain out of module import time
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    return ChatGoogleGenerativeAI(
+        model=model,
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        temperature=temperature,
+        convert_system_message_to_human=convert_system,
+    )
@@ -0,0 +1,95 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List, NamedTuple
+from langchain_core.messages import HumanMessage, SystemMessage
+from agents.llm import DEFAULT_MODEL, get_model
+
+logger = logging.getLogger(__name__)
+
+class AgentProfile(NamedTuple):
+    """System prompt and model settings for one kind of agent"""
+    system_prompt: str
+    temperature: float = 0.7
+    convert_system: bool = False
+    model: str = DEFAULT_MODEL
+
+@lru_cache(maxsize=None)
+def _system_message(system_prompt: str):
+    """SystemMessage for a prompt, built once on first use"""
+    return SystemMessage(content=system_prompt)
+
+class AgentRunner:
+    """
+    Runs a registered agent profile against the shared Gemini client
+
+    Agent modules register their profile once at import; every call then
+    reuses the same cached chat model and prebuilt SystemMessage, so all
+    agents share one client, one connection and one place to change how
+    the model is invoked.
+    """
+
+    _profiles: Dict[str, AgentProfile] = {}
+
+    @classmethod
+    def register(cls, name: str, system_prompt: str, temperature: float = 0.7,
+                 convert_system: bool = False, model: str = DEFAULT_MODEL):
+        """Register (or replace) the profile used by `AgentRunner(name)`"""
+        cls._profiles[name] = AgentProfile(system_prompt, temperature, convert_system, model)
+
+    @classmethod
+    def warm_up(cls):
+        """Build every registered profile's chat model and SystemMessage before the first request"""
+        for name, profile in cls._profiles.items():
+            try:
+                get_model(profile.model, profile.temperature, profile.convert_system)
+                _system_message(profile.system_prompt)
+            except Exception as e:
+                logger.warning("AgentRunner[%s]: warm-up failed - %s", name, e)
+
+    def __init__(self, profile: str):
+        self.name = profile
+        self.profile = self._profiles[profile]
+
+    @property
+    def model(self):
+        return get_model(self.profile.model, self.profile.temperature, self.profile.convert_system)
+
+    def messages(self, human_content: str) -> list:
+        """Build the [system, human] message pair for one request"""
+        return [_system_message(self.profile.system_prompt), HumanMessage(content=human_content)]
+
+    async def run(self, human_content: str) -> str:
+        """
+        Invoke the model once and return the raw response text
+
+        Args:
+            human_content: Fully rendered human message
+
+        Returns:
+            str: Model response content; exceptions propagate to the agent
+        """
+        logger.debug("AgentRunner[%s]: invoking model", self.name)
+        response = await self.model.ainvoke(self.messages(human_content))
+        return response.content
+
+    async def run_batch(self, human_contents: List[str], max_concurrency: int) -> list:
+        """
+        Invoke the model for many prompts through a single `abatch` call
+
+        Args:
+            human_contents: Rendered human messages, one per request
+            max_concurrency: Upper bound on in-flight model calls
+
+        Returns:
+            list: Response text or the raised exception, in input order
+        """
+        logger.debug("AgentRunner[%s]: batch of %d", self.name, len(human_contents))
+        responses = await self.model.abatch(
+            [self.messages(content) for content in human_contents],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+        return [
+            response if isinstance(response, Exception) else response.content
+            for response in responses
+        ]
@@ -0,0 +1,47 @@
+# Weather prompt module shared by the agents
+# The block is appended after the static system/instruction text so the prompt
+# prefix stays identical across requests; only this block and the user query vary.
+from functools import lru_cache
+from typing import Optional, Tuple
+
+WEATHER_BLOCK_START = "<<WEATHER>>"
+WEATHER_BLOCK_END = "<</WEATHER>>"
+
+
+def _bucket(value, step):
+    """Round numeric readings to a coarse step; pass through anything else"""
+    if isinstance(value, (int, float)):
+        return int(round(value / step) * step)
+    return value
+
+
+def bucket_weather(weather: dict) -> Tuple:
+    """
+    Reduce a weather dict to coarse, hashable prompt inputs
+
+    Equivalent conditions (within 2°C, 5% humidity, 10 AQI points) map to the
+    same tuple, and therefore to the same prompt text and LLM cache key.
+    """
+    return (
+        _bucket(weather.get('temperature', 25), 2),
+        _bucket(weather.get('humidity', 60), 5),
+        weather.get('description', 'moderate'),
+        _bucket(weather.get('aqi', 50), 10),
+        weather.get('aqi_category', 'Good'),
+    )
+
+
+@lru_cache(maxsize=512)
+def weather_context_block(temperature, humidity, conditions, aqi, aqi_category, location: Optional[str] = None) -> str:
+    """Render the delimited weather block; cached per bucketed weather combination"""
+    lines = [
+        WEATHER_BLOCK_START,
+        f"- Temperature: {temperature}°C",
+        f"- Humidity: {humidity}%",
+        f"- Weather Conditions: {conditions}",
+        f"- Air Quality Index: {aqi} ({aqi_category})",
+    ]
+    if location:
+        lines.append(f"- Location: {location}")
+    lines.append(WEATHER_BLOCK_END)
+    return "\n".join(lines)
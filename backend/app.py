@@ -1,17 +1,29 @@
 # Main FastAPI application - streamlined and modular
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import logging
+import logging.handlers
+import os
+import queue
 from dotenv import load_dotenv
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from utils.responses import APIResponse
 
 # Load environment variables
 load_dotenv()
 
-# Import route modules
+# Configure logging - LOG_LEVEL=DEBUG re-enables per-request traces. Handlers
+# only format and enqueue records; a listener thread writes them to stderr, so
+# a slow log sink (e.g. a buffered container stdout) never stalls the event loop
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+logger = logging.getLogger(__name__)
+
+# Route modules - imported after load_dotenv and logging setup, which they rely on
 from routes.auth_routes import router as auth_router
 from routes.ai_routes import router as ai_router
 from routes.hospital_routes import router as hospital_router
@@ -22,7 +34,10 @@ from surge_endpoints import router as surge_router
 app = FastAPI(
     title="SurgeSense API",
     description="AI-powered healthcare management system",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes response bodies several times faster than stdlib json;
+    # ObjectId and other Mongo types fall back to str
+    default_response_class=APIResponse
 )
 
 logger.info("SurgeSense backend starting...")
@@ -39,9 +54,12 @@ app.add_middleware(
     ],
     allow_origin_regex=r"https://.*\.vercel\.app",
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"]
+    # Exactly what the frontend uses - no wildcards, so Starlette answers
+    # preflights from fixed lists, and browsers cache them for a day
+    allow_methods=["GET", "POST", "PATCH", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["Retry-After"],
+    max_age=86400
 )
 
 logger.info("CORS middleware configured")
@@ -53,7 +71,53 @@ app.include_router(hospital_router, tags=["Hospital Management"])
 app.include_router(location_router, tags=["Location Services"])
 app.include_router(surge_router, tags=["Surge Prediction"])
 
-logger.info("All route modules loaded")
+# Compress larger JSON bodies (advisory, facility lists); small replies go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+@app.on_event("startup")
+def start_log_listener():
+    """Start writing queued log records - started here rather than at import so it runs in each worker"""
+    _log_listener.start()
+
+@app.on_event("startup")
+async def connect_database():
+    """Open the async MongoDB client before any route can use it"""
+    from config.database import db_manager
+    await db_manager.connect()
+
+@app.on_event("shutdown")
+def close_database():
+    from config.database import db_manager
+    db_manager.close()
+
+@app.on_event("startup")
+def prepare_agents():
+    """Set up the LLM cache and the Gemini clients before the first request"""
+    # Identical (system, human) prompts are answered from cache instead of Gemini
+    from config.llm_cache import configure_llm_cache
+    configure_llm_cache()
+    
+    # The agent modules registered their profiles on import; build their
+    # Gemini clients now so the first request doesn't pay for it
+    from agents.runner import AgentRunner
+    AgentRunner.warm_up()
+
+@app.on_event("startup")
+async def start_autonomous_agent():
+    """Run the autonomous agent's condition checks on a timer instead of only when polled"""
+    from services.autonomous_agent import autonomous_agent
+    autonomous_agent.start_scheduler()
+
+@app.on_event("shutdown")
+def stop_autonomous_agent():
+    from services.autonomous_agent import autonomous_agent
+    autonomous_agent.stop_scheduler()
+
+# Registered last - shutdown hooks run in order, and the ones above may still log
+@app.on_event("shutdown")
+def stop_log_listener():
+    """Write out whatever is still queued and stop the listener thread"""
+    _log_listener.stop()
 
 # Health check endpoint
 @app.get("/")
@@ -80,4 +144,5 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Single process for local runs; use gunicorn_conf.py for multiple workers
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -1,8 +1,12 @@
 # Database configuration and connection management
 import os
+import asyncio
 import logging
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from dotenv import load_dotenv
+from utils.passwords import hash_password
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -29,28 +33,128 @@ MOCK_INVENTORY = [
     {"name": "Oxygen Cylinders", "available_quantity": 25, "ai_recommended_quantity": 40, "status": "pending", "category": "Equipment", "unit": "cylinders"},
 ]
 
+def _hashed_seed_users() -> list:
+    """MOCK_USERS as stored in MongoDB - bcrypt hashes instead of the plaintext demo passwords"""
+    return [
+        {**{k: v for k, v in user.items() if k != "password"}, "password_hash": hash_password(user["password"])}
+        for user in MOCK_USERS
+    ]
+
+# Connections kept open even when idle - also how many the startup warm-up opens
+MONGO_MIN_POOL_SIZE = 10
+
+# (collection, keys, options) for every index the app depends on
+MONGO_INDEXES = (
+    # Login/signup lookups are index hits, and signup uniqueness is enforced
+    # by the server instead of a find-then-insert race
+    ("users", "email", {"unique": True}),
+    # Seed upserts match on name; unique, so workers seeding at the same time
+    # can't both insert the same member
+    ("staff", "name", {"unique": True}),
+    # Inventory is matched by name (seeding) or _id (status updates); nothing
+    # filters on status, so it gets no index that every status change would maintain
+    ("inventory", "name", {"unique": True}),
+    # Decision reports page through the newest entries first - an index walk,
+    # not an in-memory sort of the whole log
+    ("decision_log", [("timestamp", -1)], {}),
+)
+
+# Fields login needs - the hash (or legacy plaintext) and the role
+USER_LOGIN_FIELDS = {"_id": 0, "password_hash": 1, "password": 1, "role": 1}
+
+class MongoUserStore:
+    """User accounts in MongoDB - lookups and uniqueness go through the email index"""
+    
+    def __init__(self, collection):
+        self.collection = collection
+    
+    async def find_by_email(self, email: str):
+        return await self.collection.find_one({"email": email}, USER_LOGIN_FIELDS)
+    
+    async def create(self, user: dict) -> bool:
+        """Insert a new user; False if the email is already registered"""
+        try:
+            await self.collection.insert_one(user)
+        except DuplicateKeyError:
+            return False
+        return True
+    
+    async def set_password_hash(self, email: str, password_hash: bytes):
+        """Store a bcrypt hash and drop any legacy plaintext password"""
+        await self.collection.update_one(
+            {"email": email},
+            {"$set": {"password_hash": password_hash}, "$unset": {"password": ""}}
+        )
+
+class MockUserStore:
+    """User accounts in memory when MongoDB is unavailable - indexed by email"""
+    
+    def __init__(self, users: list):
+        self.users = users
+        self.by_email = {u["email"]: u for u in users}
+    
+    async def find_by_email(self, email: str):
+        return self.by_email.get(email)
+    
+    async def create(self, user: dict) -> bool:
+        """Add a new user; False if the email is already registered"""
+        if user["email"] in self.by_email:
+            return False
+        self.users.append(user)
+        self.by_email[user["email"]] = user
+        return True
+    
+    async def set_password_hash(self, email: str, password_hash: bytes):
+        """Store a bcrypt hash and drop any legacy plaintext password"""
+        # Replaced rather than edited in place - the seed list keeps its plaintext
+        user = {k: v for k, v in self.by_email[email].items() if k != "password"}
+        user["password_hash"] = password_hash
+        self.by_email[email] = user
+
 class DatabaseManager:
     def __init__(self):
         self.client = None
         self.db = None
         self.collections = {}
-        self._connect()
+        self._verify_task = None
+        # Resolved whenever the backend changes, so routes never branch on it
+        self._mock_users = MockUserStore(MOCK_USERS)
+        self.users = self._mock_users
     
-    def _connect(self):
-        """Initialize MongoDB connection with fallback to mock data"""
+    async def connect(self):
+        """
+        Initialize MongoDB connection with fallback to mock data - called on app startup
+        
+        The client connects lazily, so this returns immediately; the ping and
+        seeding run as a background task and switch to the in-memory fallback
+        if MongoDB turns out to be unreachable.
+        """
         try:
             mongo_uri = os.getenv("MONGO_URI")
             if not mongo_uri:
                 raise ValueError("MONGO_URI not found in environment variables")
             
-            self.client = MongoClient(
+            # Pool sized for bursty dashboard traffic: warm connections are kept
+            # around so requests don't pay the TLS handshake, and a saturated
+            # pool fails fast instead of queueing requests indefinitely
+            self.client = AsyncIOMotorClient(
                 mongo_uri,
                 connectTimeoutMS=5000,
-                serverSelectionTimeoutMS=5000
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=200,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=300_000,
+                waitQueueTimeoutMS=2_000,
+                socketTimeoutMS=10_000,
+                # Stored timestamps are UTC; read them back timezone-aware so they
+                # serialize with their offset
+                tz_aware=True,
+                retryWrites=True,
+                # Dashboard reads are JSON-like documents that compress well; the
+                # server picks the first compressor it supports (zlib is stdlib)
+                compressors="zstd,zlib",
+                appname="surgesense"
             )
-            
-            # Test connection
-            self.client.admin.command('ping')
             self.db = self.client["SurgeSense"]
             
             # Initialize collections
@@ -61,29 +165,96 @@ class DatabaseManager:
                 "decision_log": self.db["decision_log"],
                 "settings": self.db["settings"]
             }
+            self.users = MongoUserStore(self.collections["users"])
             
-            logger.info("MongoDB connected successfully")
-            self._seed_data()
+            # Test connection off the startup path
+            self._verify_task = asyncio.create_task(self._verify_connection())
             
         except Exception as e:
-            logger.warning(f"MongoDB connection failed: {e}. Using in-memory fallback.")
-            self.client = None
-            self.db = None
-            self.collections = {}
-    
-    def _seed_data(self):
-        """Seed initial data if collections are empty"""
-        if self.collections["users"].count_documents({}) == 0:
-            self.collections["users"].insert_many(MOCK_USERS)
-            logger.info("Users seeded to MongoDB")
+            self._use_fallback(e)
+    
+    async def _verify_connection(self):
+        """Ping MongoDB and seed it, falling back to mock data if it is unreachable"""
+        try:
+            await self.client.admin.command('ping')
+        except Exception as e:
+            self._use_fallback(e)
+            return
+        logger.info("MongoDB connected successfully")
         
-        if self.collections["staff"].count_documents({}) == 0:
-            self.collections["staff"].insert_many(MOCK_STAFF)
-            logger.info("Staff seeded to MongoDB")
+        # The server is reachable from here on - setup failures are logged and
+        # the connection is kept, rather than dropping a healthy client for mock data
+        try:
+            # Hashing the seed passwords is CPU work in a thread, so it overlaps
+            # the pool warm-up and index builds, which are independent round trips
+            seed_users = asyncio.create_task(asyncio.to_thread(_hashed_seed_users))
+            await asyncio.gather(self._warm_pool(), self._ensure_indexes())
+            await self._seed_data(await seed_users)
+        except Exception as e:
+            logger.warning("MongoDB setup incomplete, continuing with the live connection: %s", e)
+    
+    def _use_fallback(self, error: Exception):
+        logger.warning("MongoDB connection failed: %s. Using in-memory fallback.", error)
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.db = None
+        self.collections = {}
+        self.users = self._mock_users
+    
+    async def _warm_pool(self):
+        """Open the baseline connections now rather than on the first burst of requests"""
+        # Concurrent pings each need their own socket, so the pool fills to MONGO_MIN_POOL_SIZE
+        await asyncio.gather(*(
+            self.client.admin.command('ping') for _ in range(MONGO_MIN_POOL_SIZE)
+        ))
+    
+    async def _ensure_indexes(self):
+        """Create the indexes the routes and seeding rely on"""
+        await asyncio.gather(*(
+            self._create_index(name, keys, **options)
+            for name, keys, options in MONGO_INDEXES
+        ))
+    
+    async def _create_index(self, name: str, keys, **options):
+        try:
+            await self.collections[name].create_index(keys, **options)
+        except Exception as e:
+            logger.warning("Could not create %s index %s: %s", name, keys, e)
+    
+    async def _seed_data(self, seed_users: list):
+        """
+        Seed initial data - upserts, so existing documents are never duplicated or overwritten
         
-        if self.collections["inventory"].count_documents({}) == 0:
-            self.collections["inventory"].insert_many(MOCK_INVENTORY)
-            logger.info("Inventory seeded to MongoDB")
+        Each collection is one unordered bulk write and all three run
+        concurrently, so seeding costs a single round trip; workers starting
+        together are safe because the upserts are idempotent.
+        
+        Args:
+            seed_users: MOCK_USERS with hashed passwords, from _hashed_seed_users()
+        """
+        await asyncio.gather(*(
+            self._seed_collection(name, documents, key)
+            for name, documents, key in (
+                ("users", seed_users, "email"),
+                ("staff", MOCK_STAFF, "name"),
+                ("inventory", MOCK_INVENTORY, "name"),
+            )
+        ))
+    
+    async def _seed_collection(self, name: str, documents: list, key: str):
+        try:
+            result = await self.collections[name].bulk_write([
+                UpdateOne({key: doc[key]}, {"$setOnInsert": doc}, upsert=True)
+                for doc in documents
+            ], ordered=False)
+        except Exception as e:
+            # Includes duplicate-key errors when another worker upserted the same
+            # documents first - they are seeded either way
+            logger.warning("Seeding %s incomplete: %s", name, e)
+            return
+        if result.upserted_count:
+            logger.info("%s %s seeded to MongoDB", result.upserted_count, name)
     
     def get_collection(self, name: str):
         """Get collection or return None for fallback handling"""
@@ -92,6 +263,11 @@ class DatabaseManager:
     def is_connected(self) -> bool:
         """Check if MongoDB is connected"""
         return self.client is not None
+    
+    def close(self):
+        """Close the MongoDB client - called on app shutdown"""
+        if self.client is not None:
+            self.client.close()
 
-# Global database instance
+# Global database instance - connected by the app startup event
 db_manager = DatabaseManager()
\ No newline at end of file
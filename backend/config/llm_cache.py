@@ -0,0 +1,105 @@
+# LLM response cache configuration - short-circuits repeated Gemini calls
+import logging
+import os
+from collections import OrderedDict
+from langchain.globals import set_llm_cache
+from langchain_community.cache import InMemoryCache, RedisCache, SQLiteCache
+from sqlalchemy import text
+from utils.cache_keys import cache_key
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_MAXSIZE = 10_000
+
+# Redis entries expire after this many seconds; Redis' own maxmemory policy caps memory
+LLM_CACHE_TTL = 24 * 60 * 60
+
+# SQLite is trimmed back to LLM_CACHE_MAXSIZE once every this many writes
+SQLITE_TRIM_INTERVAL = 100
+
+
+class BoundedInMemoryCache(InMemoryCache):
+    """
+    InMemoryCache with least-recently-used eviction once `maxsize` entries are stored
+
+    Entries are keyed by a BLAKE3 digest of (prompt, llm_string) rather than
+    the multi-kilobyte strings themselves.
+    """
+
+    def __init__(self, maxsize: int = LLM_CACHE_MAXSIZE):
+        super().__init__()
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+
+    def lookup(self, prompt, llm_string):
+        key = cache_key(prompt, llm_string)
+        if key not in self._cache:
+            return None
+        self._cache.move_to_end(key)
+        return self._cache[key]
+
+    def update(self, prompt, llm_string, return_val):
+        key = cache_key(prompt, llm_string)
+        self._cache[key] = return_val
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+
+class BoundedSQLiteCache(SQLiteCache):
+    """SQLiteCache that drops its oldest rows once more than `maxsize` are stored"""
+
+    def __init__(self, database_path: str, maxsize: int = LLM_CACHE_MAXSIZE):
+        super().__init__(database_path=database_path)
+        self.maxsize = maxsize
+        self._writes = 0
+
+    def update(self, prompt, llm_string, return_val):
+        super().update(prompt, llm_string, return_val)
+        self._writes += 1
+        if self._writes % SQLITE_TRIM_INTERVAL == 0:
+            self._trim()
+
+    def _trim(self):
+        table = self.cache_schema.__tablename__
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                f"DELETE FROM {table} WHERE rowid NOT IN "
+                f"(SELECT rowid FROM {table} ORDER BY rowid DESC LIMIT :maxsize)"
+            ), {"maxsize": self.maxsize})
+
+
+def _build_llm_cache():
+    """Pick the cache backend from LLM_CACHE_BACKEND: redis, sqlite (default) or memory"""
+    backend = os.getenv("LLM_CACHE_BACKEND") or ("redis" if os.getenv("REDIS_URL") else "sqlite")
+
+    if backend == "redis":
+        # Shared by every worker and instance; survives restarts
+        from redis import Redis
+        redis_client = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        return RedisCache(redis_=redis_client, ttl=LLM_CACHE_TTL), "redis"
+
+    if backend == "sqlite":
+        # Shared by all uvicorn workers on one box; survives restarts
+        database_path = os.getenv("LLM_CACHE_DB", "/tmp/llm_cache.db")
+        return BoundedSQLiteCache(database_path=database_path, maxsize=LLM_CACHE_MAXSIZE), f"sqlite:{database_path}"
+
+    return BoundedInMemoryCache(maxsize=LLM_CACHE_MAXSIZE), "memory"
+
+
+def configure_llm_cache():
+    """
+    Enable the process-wide exact-match cache used by every LangChain model call
+
+    Async model calls read and write the cache through LangChain's executor
+    wrappers, so a slow SQLite or Redis write never blocks the event loop.
+    Falls back to the in-memory cache if the configured backend is unavailable.
+    """
+    try:
+        llm_cache, description = _build_llm_cache()
+    except Exception as e:
+        logger.warning("Persistent LLM cache unavailable, using in-memory cache: %s", e)
+        llm_cache, description = BoundedInMemoryCache(maxsize=LLM_CACHE_MAXSIZE), "memory"
+
+    set_llm_cache(llm_cache)
+    logger.info("LLM cache enabled (%s, maxsize=%s)", description, LLM_CACHE_MAXSIZE)
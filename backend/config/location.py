@@ -0,0 +1,6 @@
+# Default location - endpoints without user coordinates answer for Mumbai
+MUMBAI_LAT, MUMBAI_LON = 19.0760, 72.8777
+
+# Shared by every response that reports the default location - never mutate it.
+# A plain dict rather than a MappingProxyType because orjson only encodes dicts
+MUMBAI_LOCATION = {"lat": MUMBAI_LAT, "lon": MUMBAI_LON, "city": "Mumbai"}
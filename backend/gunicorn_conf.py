@@ -0,0 +1,32 @@
+# Gunicorn configuration - production server with multiple Uvicorn workers
+#
+# Run from backend/:
+#   gunicorn app:app -c gunicorn_conf.py
+#
+# Each worker is a separate process with its own event loop, so a CPU-heavy
+# request only stalls its own worker. UvicornWorker picks uvloop and httptools
+# automatically when they are installed (see requirements.txt).
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# WEB_CONCURRENCY overrides the usual (2 x CPU) + 1 rule, e.g. on small containers
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Session tokens must verify in every worker, which needs one shared signing key
+if workers > 1 and not os.getenv("JWT_SECRET"):
+    raise RuntimeError("JWT_SECRET must be set when running more than one worker")
+
+# The autonomous agent's timer runs per process - N workers would analyse N times
+if workers > 1 and int(os.getenv("AUTONOMOUS_CHECK_INTERVAL", "0")) > 0:
+    raise RuntimeError("AUTONOMOUS_CHECK_INTERVAL needs a single worker (set WEB_CONCURRENCY=1)")
+
+# Heartbeat files in RAM - avoids workers stalling on slow or disk-backed /tmp
+worker_tmp_dir = "/dev/shm"
+
+# LLM calls can take a while; don't let the arbiter kill busy workers early
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
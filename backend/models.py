@@ -1,9 +1,27 @@
 # MongoDB Models for SurgeSense Hospital Management
-from pydantic import BaseModel
+from pydantic import BaseModel, Extra, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
+def utc_now() -> datetime:
+    """Timezone-aware current UTC time, as stored by the routes"""
+    return datetime.now(timezone.utc)
+
+class RequestModel(BaseModel):
+    """
+    Base for API request bodies
+    
+    Unknown fields are dropped rather than rejected - the frontend sends a
+    few extra keys (e.g. `role` on signup) - and strings are taken as sent,
+    so validation does no whitespace normalisation. Bodies are immutable
+    once parsed, which also makes them hashable.
+    """
+    class Config:
+        extra = Extra.ignore
+        anystr_strip_whitespace = False
+        frozen = True
+
 class StaffStatus(str, Enum):
     ON_DUTY = "on_duty"
     OFF_DUTY = "off_duty"
@@ -42,7 +60,7 @@ class InventoryItem(BaseModel):
     available_quantity: int
     ai_recommended_quantity: int
     status: DecisionStatus = DecisionStatus.PENDING
-    last_updated: datetime = datetime.now()
+    last_updated: datetime = Field(default_factory=utc_now)
     category: str = "general"
     unit: str = "units"
 
@@ -51,7 +69,7 @@ class DecisionLog(BaseModel):
     item_name: str
     original_recommendation: str
     final_decision: DecisionStatus
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = Field(default_factory=utc_now)
     reasoning: Optional[str] = None
     user_id: Optional[str] = None
 
@@ -1,43 +1,137 @@
 # AI-powered routes - dynamic health advisory using AI agents
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from models import RequestModel
+from typing import List, Optional
+import asyncio
 import logging
-from agents.citizen_agent import generate_citizen_response
+import orjson
+from cachetools import TTLCache
+from agents.citizen_agent import generate_citizen_response, generate_citizen_responses_batch
 from agents.hospital_agent import generate_hospital_response
 from agents.landing_agent import generate_landing_response
+from agents.weather_context import bucket_weather
 from utils.weather_api import get_weather
-from utils.weather_aqi import get_air_quality, classify_aqi_us
+from utils.weather_aqi import fetch_aqi
+from utils.llm_capacity import llm_capacity
+from utils.blocking import run_http
+from config.location import MUMBAI_LAT, MUMBAI_LON, MUMBAI_LOCATION
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-class CitizenAIModel(BaseModel):
+# Every endpoint that can reach Gemini holds an AI slot; see utils.llm_capacity
+_LLM_BOUND = [Depends(llm_capacity)]
+
+class CitizenAIModel(RequestModel):
     message: str
     lat: Optional[float] = None
     lon: Optional[float] = None
     return_json: bool = False
 
-class HospitalAIModel(BaseModel):
+class HospitalAIModel(RequestModel):
     query: str
 
-class LandingAIModel(BaseModel):
+class LandingAIModel(RequestModel):
     content: Optional[str] = None
 
-@router.post("/citizen-response")
-def citizen_response(data: CitizenAIModel):
+class CitizenBatchItem(RequestModel):
+    message: str
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+class CitizenBatchModel(RequestModel):
+    items: List[CitizenBatchItem]
+    return_json: bool = True
+
+# Static advisory tables - built once at import and returned by reference
+ADVISORY_SECTIONS_FALLBACK = {
+    "foods": ("AI-recommended balanced nutrition",),
+    "fruits": ("AI-selected seasonal fruits",),
+    "ayurvedic": ("AI-powered ayurvedic guidance",),
+    "avoid": ("AI-identified health risks to avoid",),
+}
+
+ADVISORY_SECTION_DEFAULTS = {
+    "foods": ("dietPlan", ("Balanced meals based on current weather",)),
+    "fruits": ("fruits", ("Seasonal fruits recommended by AI",)),
+    "ayurvedic": ("ayurvedicTips", ("AI-recommended ayurvedic practices",)),
+    "avoid": ("avoidThese", ("AI-identified items to avoid",)),
+}
+
+ADVISORY_ERROR_RESPONSE = {
+    "success": True,
+    "advisory": {
+        "weather_alert": "📍 Mumbai: AI-powered health recommendations available",
+        "foods": ("AI-recommended balanced nutrition for current conditions",),
+        "fruits": ("AI-selected seasonal fruits for optimal health",),
+        "ayurvedic": ("AI-powered traditional wellness practices",),
+        "avoid": ("AI-identified health risks based on current environment",),
+        "location": MUMBAI_LOCATION
+    }
+}
+
+# The error fallback never changes, so it is encoded once and sent as-is
+ADVISORY_ERROR_BODY = orjson.dumps(ADVISORY_ERROR_RESPONSE)
+
+# Advisory sections per bucketed (temperature, humidity, conditions, AQI) combination,
+# stored pre-encoded as orjson fragments so a new reading only encodes the weather alert
+_advisory_sections_cache = TTLCache(maxsize=256, ttl=600)
+
+# Finished /health-advisory bodies per exact weather reading
+_advisory_body_cache = TTLCache(maxsize=64, ttl=600)
+
+async def _generate_advisory_sections(weather_data: dict, aqi_value, aqi_category) -> dict:
+    """Ask the citizen agent for the advisory lists, falling back to the static tables"""
+    # AI agent generates dynamic health advisory based on current conditions
+    advisory_message = f"Generate health advisory for Mumbai with temperature {weather_data.get('temperature', 25)}°C, humidity {weather_data.get('humidity', 60)}%, and AQI {aqi_value} ({aqi_category}). Include foods, fruits, ayurvedic tips, and things to avoid."
+    
+    # Use AI agent to generate dynamic recommendations
+    ai_response = await generate_citizen_response(advisory_message, weather_data, True)
+    
+    # Extract recommendations from AI response or provide fallback structure
+    if isinstance(ai_response, dict):
+        return {
+            section: ai_response.get(key) or default
+            for section, (key, default) in ADVISORY_SECTION_DEFAULTS.items()
+        }
+    # Fallback if AI response format is different
+    return ADVISORY_SECTIONS_FALLBACK
+
+async def _weather_context(lat: float, lon: float) -> dict:
+    """Live weather plus AQI for the agents, with safe defaults"""
+    # Both lookups are independent, so they run concurrently
+    weather_data, (aqi_value, aqi_category) = await asyncio.gather(
+        run_http(get_weather, lat, lon),
+        fetch_aqi(lat, lon),
+        return_exceptions=True
+    )
+    
+    if isinstance(weather_data, BaseException) or not weather_data:
+        weather_data = {
+            "temperature": 25,
+            "humidity": 60,
+            "description": "moderate conditions"
+        }
+    
+    weather_data['aqi'], weather_data['aqi_category'] = aqi_value, aqi_category
+    
+    return weather_data
+
+@router.post("/citizen-response", dependencies=_LLM_BOUND)
+async def citizen_response(data: CitizenAIModel):
     """Floating chatbot endpoint - uses AI agent for dynamic responses"""
-    logger.info(f"Floating chatbot query: {data.message[:50]}...")
+    logger.info("Floating chatbot query: %.50s...", data.message)
     
     try:
         # Use provided coordinates or fallback to Mumbai
-        lat = data.lat if data.lat else 19.0760
-        lon = data.lon if data.lon else 72.8777
+        lat = data.lat if data.lat else MUMBAI_LAT
+        lon = data.lon if data.lon else MUMBAI_LON
         
-        logger.info(f"Using coordinates: {lat}, {lon}")
+        logger.info("Using coordinates: %s, %s", lat, lon)
         
         # AI agent generates dynamic response based on location and weather
-        response_text = generate_landing_response(data.message, lat, lon)
+        response_text = await generate_landing_response(data.message, lat, lon)
         
         return {
             "success": True,
@@ -46,47 +140,30 @@ def citizen_response(data: CitizenAIModel):
         }
         
     except Exception as e:
-        logger.error(f"Floating chatbot error: {e}")
+        logger.error("Floating chatbot error: %s", e)
         return {
             "success": False,
             "message": "Health assistant temporarily unavailable",
             "error": str(e)
         }
 
-@router.post("/citizenai")
-def citizenai(data: CitizenAIModel):
+@router.post("/citizenai", dependencies=_LLM_BOUND)
+async def citizenai(data: CitizenAIModel):
     """Citizen dashboard endpoint - AI agent generates complete health plan"""
-    logger.info(f"CitizenAI dashboard query: {data.message[:50]}...")
+    logger.info("CitizenAI dashboard query: %.50s...", data.message)
     
     try:
         # Use provided coordinates or fallback to Mumbai
-        lat = data.lat if data.lat else 19.0760
-        lon = data.lon if data.lon else 72.8777
-        
-        logger.info(f"Using coordinates: {lat}, {lon}")
-        
-        # Get live weather data for AI context
-        weather_data = get_weather(lat, lon)
-        if not weather_data:
-            weather_data = {
-                "temperature": 25,
-                "humidity": 60,
-                "description": "moderate conditions"
-            }
-        
-        # Get AQI data for comprehensive health recommendations
-        try:
-            aqi_data = get_air_quality(lat, lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-            aqi_category = classify_aqi_us(aqi_value)
-            weather_data['aqi'] = aqi_value
-            weather_data['aqi_category'] = aqi_category
-        except Exception:
-            weather_data['aqi'] = 50
-            weather_data['aqi_category'] = 'Good'
+        lat = data.lat if data.lat else MUMBAI_LAT
+        lon = data.lon if data.lon else MUMBAI_LON
+        
+        logger.info("Using coordinates: %s, %s", lat, lon)
+        
+        # Get live weather and AQI data for AI context
+        weather_data = await _weather_context(lat, lon)
         
         # AI agent generates dynamic health plan based on real-time data
-        response_data = generate_citizen_response(data.message, weather_data, True)
+        response_data = await generate_citizen_response(data.message, weather_data, True)
         
         return {
             "success": True,
@@ -96,129 +173,152 @@ def citizenai(data: CitizenAIModel):
         }
         
     except Exception as e:
-        logger.error(f"Citizen dashboard error: {e}")
+        logger.error("Citizen dashboard error: %s", e)
+        return {
+            "success": False,
+            "message": "Health assistant temporarily unavailable",
+            "error": str(e)
+        }
+
+@router.post("/api/citizenai/batch", dependencies=_LLM_BOUND)
+async def citizenai_batch(data: CitizenBatchModel):
+    """Bulk health plans for hospital-side use - one batched LLM call for all items"""
+    logger.info("CitizenAI batch query: %s items", len(data.items))
+    
+    try:
+        # Fetch weather once per distinct location, not once per item
+        locations = {
+            (item.lat if item.lat else MUMBAI_LAT, item.lon if item.lon else MUMBAI_LON)
+            for item in data.items
+        }
+        weather_by_location = {}
+        for lat, lon in locations:
+            weather_by_location[(lat, lon)] = await _weather_context(lat, lon)
+        
+        items = []
+        for item in data.items:
+            location = (item.lat if item.lat else MUMBAI_LAT, item.lon if item.lon else MUMBAI_LON)
+            items.append((item.message, dict(weather_by_location[location])))
+        
+        responses = await generate_citizen_responses_batch(items, data.return_json)
+        
+        return {
+            "success": True,
+            "results": [
+                {"data": response, "weather": weather}
+                for response, (_, weather) in zip(responses, items)
+            ]
+        }
+        
+    except Exception as e:
+        logger.error("Citizen batch error: %s", e)
         return {
             "success": False,
             "message": "Health assistant temporarily unavailable",
             "error": str(e)
         }
 
-@router.post("/hospital-response")
-def hospital_response(data: HospitalAIModel):
+@router.post("/hospital-response", dependencies=_LLM_BOUND)
+async def hospital_response(data: HospitalAIModel):
     """Hospital AI assistant - dynamic responses for hospital staff"""
-    logger.info(f"Hospital query: {data.query[:50]}...")
+    logger.info("Hospital query: %.50s...", data.query)
     
     try:
         # AI agent generates contextual hospital management advice
-        response_text = generate_hospital_response(data.query)
+        response_text = await generate_hospital_response(data.query)
         return {
             "success": True,
             "response": response_text
         }
     except Exception as e:
-        logger.error(f"Hospital response error: {e}")
+        logger.error("Hospital response error: %s", e)
         return {
             "success": False,
             "message": "Hospital assistant temporarily unavailable"
         }
 
-@router.post("/landing-response")
-def landing_response(data: Optional[LandingAIModel] = None):
+@router.post("/landing-response", dependencies=_LLM_BOUND)
+async def landing_response(data: Optional[LandingAIModel] = None):
     """Landing page AI assistant - welcoming and informative responses"""
     logger.info("Landing page query received")
     
     try:
         content = data.content if data else "Welcome to HealthAI"
         # AI agent generates engaging landing page content
-        response_text = generate_landing_response(content, 0, 0)
+        response_text = await generate_landing_response(content, 0, 0)
         return {
             "success": True,
             "response": response_text
         }
     except Exception as e:
-        logger.error(f"Landing response error: {e}")
+        logger.error("Landing response error: %s", e)
         return {
             "success": False,
             "message": "Landing assistant temporarily unavailable"
         }
 
-@router.get("/health-advisory")
-def health_advisory():
+async def _build_advisory_body(weather_data: dict, temp, humidity, aqi_value, aqi_category) -> bytes:
+    """Encoded /health-advisory response for one weather reading"""
+    # Foods/fruits/ayurvedic/avoid only depend on the bucketed conditions,
+    # so the AI call runs once per bucket instead of once per reading
+    advisory_key = bucket_weather(weather_data)
+    sections = _advisory_sections_cache.get(advisory_key)
+    if sections is None:
+        sections = await _generate_advisory_sections(weather_data, aqi_value, aqi_category)
+        sections = {
+            section: orjson.Fragment(orjson.dumps(items))
+            for section, items in sections.items()
+        }
+        _advisory_sections_cache[advisory_key] = sections
+    
+    # Generate weather alert using AI context
+    weather_alert = f"📍 Mumbai: {temp}°C, {humidity}% humidity, AQI {aqi_value} ({aqi_category}). "
+    
+    if temp > 32:
+        weather_alert += "AI recommends staying hydrated and avoiding heat exposure."
+    elif temp < 10:
+        weather_alert += "AI suggests keeping warm and boosting immunity."
+    elif aqi_value > 150:
+        weather_alert += "AI advises staying indoors due to poor air quality."
+    else:
+        weather_alert += "AI indicates good conditions for outdoor activities."
+    
+    return orjson.dumps({
+        "success": True,
+        "advisory": {
+            "weather_alert": weather_alert,
+            **sections,
+            "location": MUMBAI_LOCATION
+        }
+    })
+
+@router.get("/health-advisory", dependencies=_LLM_BOUND)
+async def health_advisory():
     """Dynamic health advisory generated by AI based on current conditions"""
     logger.info("Health advisory requested")
     
     try:
         # Default location - Mumbai (should be replaced with actual user location)
-        lat, lon = 19.0760, 72.8777
+        lat, lon = MUMBAI_LAT, MUMBAI_LON
         
         # Get real-time weather and AQI data
-        weather_data = get_weather(lat, lon)
-        if not weather_data:
-            weather_data = {"temperature": 25, "humidity": 60, "description": "moderate conditions"}
-        
-        try:
-            aqi_data = get_air_quality(lat, lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-            aqi_category = classify_aqi_us(aqi_value)
-        except Exception:
-            aqi_value = 50
-            aqi_category = 'Good'
-        
-        # AI agent generates dynamic health advisory based on current conditions
-        advisory_message = f"Generate health advisory for Mumbai with temperature {weather_data.get('temperature', 25)}°C, humidity {weather_data.get('humidity', 60)}%, and AQI {aqi_value} ({aqi_category}). Include foods, fruits, ayurvedic tips, and things to avoid."
-        
-        # Use AI agent to generate dynamic recommendations
-        ai_response = generate_citizen_response(advisory_message, weather_data, True)
-        
-        # Extract recommendations from AI response or provide fallback structure
-        if isinstance(ai_response, dict):
-            foods = ai_response.get('dietPlan', ["Balanced meals based on current weather"])
-            fruits = ai_response.get('fruits', ["Seasonal fruits recommended by AI"])
-            ayurvedic = ai_response.get('ayurvedicTips', ["AI-recommended ayurvedic practices"])
-            avoid = ai_response.get('avoidThese', ["AI-identified items to avoid"])
-        else:
-            # Fallback if AI response format is different
-            foods = ["AI-recommended balanced nutrition"]
-            fruits = ["AI-selected seasonal fruits"]
-            ayurvedic = ["AI-powered ayurvedic guidance"]
-            avoid = ["AI-identified health risks to avoid"]
-        
-        # Generate weather alert using AI context
-        temp = weather_data.get('temperature', 25)
-        weather_alert = f"📍 Mumbai: {temp}°C, {weather_data.get('humidity', 60)}% humidity, AQI {aqi_value} ({aqi_category}). "
+        weather_data = await _weather_context(lat, lon)
+        aqi_value = weather_data['aqi']
+        aqi_category = weather_data['aqi_category']
         
-        if temp > 32:
-            weather_alert += "AI recommends staying hydrated and avoiding heat exposure."
-        elif temp < 10:
-            weather_alert += "AI suggests keeping warm and boosting immunity."
-        elif aqi_value > 150:
-            weather_alert += "AI advises staying indoors due to poor air quality."
-        else:
-            weather_alert += "AI indicates good conditions for outdoor activities."
+        # The weather cache serves the same reading for minutes at a time, so the
+        # finished body is reused until the reading changes
+        temp = weather_data.get('temperature', 25)
+        humidity = weather_data.get('humidity', 60)
+        body_key = (temp, humidity, weather_data.get('description'), aqi_value, aqi_category)
+        body = _advisory_body_cache.get(body_key)
+        if body is None:
+            body = await _build_advisory_body(weather_data, temp, humidity, aqi_value, aqi_category)
+            _advisory_body_cache[body_key] = body
         
-        return {
-            "success": True,
-            "advisory": {
-                "weather_alert": weather_alert,
-                "foods": foods,
-                "fruits": fruits,
-                "ayurvedic": ayurvedic,
-                "avoid": avoid,
-                "location": {"lat": lat, "lon": lon, "city": "Mumbai"}
-            }
-        }
+        return Response(content=body, media_type="application/json")
     
     except Exception as e:
-        logger.error(f"Health advisory error: {e}")
+        logger.error("Health advisory error: %s", e)
         # AI-powered fallback recommendations
-        return {
-            "success": True,
-            "advisory": {
-                "weather_alert": "📍 Mumbai: AI-powered health recommendations available",
-                "foods": ["AI-recommended balanced nutrition for current conditions"],
-                "fruits": ["AI-selected seasonal fruits for optimal health"],
-                "ayurvedic": ["AI-powered traditional wellness practices"],
-                "avoid": ["AI-identified health risks based on current environment"],
-                "location": {"lat": 19.0760, "lon": 72.8777, "city": "Mumbai"}
-            }
-        }
\ No newline at end of file
+        return Response(content=ADVISORY_ERROR_BODY, media_type="application/json")
@@ -1,77 +1,87 @@
 # Authentication routes - login and signup endpoints
 from fastapi import APIRouter
-from pydantic import BaseModel
+from models import RequestModel
 import logging
-from config.database import db_manager, MOCK_USERS
+from cachetools import TTLCache
+from config.database import db_manager
+from utils.blocking import run_cpu
+from utils.passwords import check_password, hash_password
+from utils.sessions import issue_token
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-class LoginModel(BaseModel):
+# email -> user document (password hash, role); repeat logins skip MongoDB
+_login_cache = TTLCache(maxsize=10_000, ttl=60)
+
+class LoginModel(RequestModel):
     email: str
     password: str
 
-class SignupModel(BaseModel):
+class SignupModel(RequestModel):
     name: str
     email: str
     password: str
 
 @router.post("/login")
-def login(data: LoginModel):
+async def login(data: LoginModel):
     """User authentication endpoint"""
-    logger.info(f"Login attempt for: {data.email}")
+    logger.info("Login attempt for: %s", data.email)
     
     try:
-        users_collection = db_manager.get_collection("users")
+        user = _login_cache.get(data.email)
+        if user is None:
+            # MongoDB or the in-memory fallback, whichever is live; the hash is checked here
+            user = await db_manager.users.find_by_email(data.email)
+            if user:
+                _login_cache[data.email] = user
         
-        if users_collection is not None:
-            user = users_collection.find_one({
-                "email": data.email,
-                "password": data.password
-            })
-        else:
-            # Fallback to mock users
-            user = next((u for u in MOCK_USERS if u["email"] == data.email and u["password"] == data.password), None)
+        # bcrypt is deliberately slow, so it runs off the event loop
+        if user and not await run_cpu(check_password, data.password, user):
+            user = None
         
         if not user:
             return {"success": False, "message": "Invalid email or password"}
         
+        # Accounts stored before hashing move to bcrypt on their first good login
+        if not user.get("password_hash"):
+            try:
+                password_hash = await run_cpu(hash_password, data.password)
+                await db_manager.users.set_password_hash(data.email, password_hash)
+                _login_cache.pop(data.email, None)
+            except Exception as e:
+                logger.warning("Password rehash failed for %s: %s", data.email, e)
+        
         return {
             "success": True,
             "role": user["role"],
+            "token": issue_token(data.email, user["role"]),
             "message": f"Successfully logged in as {user['role']}"
         }
     except Exception as e:
-        logger.error(f"Login error: {e}")
+        logger.error("Login error: %s", e)
         return {"success": False, "message": "Login service temporarily unavailable"}
 
 @router.post("/signup")
-def signup(data: SignupModel):
+async def signup(data: SignupModel):
     """User registration endpoint"""
-    logger.info(f"Signup attempt for: {data.email}")
+    logger.info("Signup attempt for: %s", data.email)
     
     try:
         new_user = {
             "name": data.name,
             "email": data.email,
-            "password": data.password,
+            "password_hash": await run_cpu(hash_password, data.password),
             "role": "citizen"
         }
         
-        users_collection = db_manager.get_collection("users")
+        # Single round trip - the store rejects an already registered email
+        if not await db_manager.users.create(new_user):
+            return {"success": False, "message": "User already exists"}
         
-        if users_collection is not None:
-            existing_user = users_collection.find_one({"email": data.email})
-            if existing_user:
-                return {"success": False, "message": "User already exists"}
-            users_collection.insert_one(new_user)
-        else:
-            # Fallback to mock users
-            if any(u["email"] == data.email for u in MOCK_USERS):
-                return {"success": False, "message": "User already exists"}
-            MOCK_USERS.append(new_user)
+        _login_cache.pop(data.email, None)
         
         return {"success": True, "message": "User created successfully"}
     except Exception as e:
-        logger.error(f"Signup error: {e}")
+        logger.error("Signup error: %s", e)
         return {"success": False, "message": "Signup service temporarily unavailable"}
\ No newline at end of file
@@ -1,19 +1,175 @@
 # Hospital management routes - AI-powered staff and inventory management
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Request, Response
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 import logging
-from datetime import datetime
+import orjson
+import random
+from datetime import datetime, timezone
 from bson import ObjectId
-from config.database import db_manager
+from cachetools import TTLCache
+from pymongo import ReturnDocument, UpdateOne
+from config.database import db_manager, MOCK_INVENTORY
 from services.ai_hospital_manager import get_ai_staff_data, get_ai_inventory_data, get_ai_patient_stats
 from utils.weather_api import get_weather
-from utils.weather_aqi import get_air_quality, classify_aqi_us
+from utils.weather_aqi import get_air_quality, aqi_reading, fetch_aqi
+from utils.blocking import run_http
+from utils.cache_keys import cache_key
+from utils.sessions import current_user
+from config.location import MUMBAI_LAT, MUMBAI_LON
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-class StaffRecommendationRequest(BaseModel):
+# Staff and inventory data (and the actions on them) are only for logged-in users; see utils.sessions
+_SESSION_REQUIRED = [Depends(current_user)]
+
+DEFAULT_SETTINGS = {
+    "city": "Mumbai",
+    "latitude": MUMBAI_LAT,
+    "longitude": MUMBAI_LON,
+    "aqi_threshold_high": 150,
+    "aqi_threshold_medium": 100,
+    "temperature_threshold_high": 32,
+    "temperature_threshold_low": 15,
+    "hospital_name": "SurgeSense Medical Center"
+}
+
+# The settings document is only ever written by the first-use upsert, so
+# reads are served from memory for a few minutes at a time - as the encoded
+# response body and its ETag
+_settings_cache = TTLCache(maxsize=1, ttl=300)
+
+# Encoded decision report pages and their ETags by (skip, limit); a few seconds
+# of staleness is fine and status updates clear it, so a user sees their own
+# decision immediately
+_decisions_cache = TTLCache(maxsize=32, ttl=10)
+
+# Bumped on every invalidation; a report read that started before the bump
+# doesn't write its (possibly stale) page back into the cache
+_decisions_generation = 0
+
+# Decision log inserts still in flight; holding them keeps the tasks from being collected
+_pending_decision_logs = set()
+
+# Realistic medical inventory served when the AI agent is unavailable; ids are already strings
+INVENTORY_FALLBACK = [
+    {"name": "N95 Masks", "available_quantity": 450, "ai_recommended_quantity": 600, "status": "monitor", "category": "PPE", "unit": "pieces", "_id": "mask_001"},
+    {"name": "Surgical Gloves", "available_quantity": 1200, "ai_recommended_quantity": 1500, "status": "sufficient", "category": "PPE", "unit": "pairs", "_id": "glove_001"},
+    {"name": "Oxygen Cylinders", "available_quantity": 25, "ai_recommended_quantity": 35, "status": "monitor", "category": "Equipment", "unit": "cylinders", "_id": "oxygen_001"},
+    {"name": "IV Fluids (Saline)", "available_quantity": 180, "ai_recommended_quantity": 220, "status": "sufficient", "category": "Medicine", "unit": "bags", "_id": "iv_001"},
+    {"name": "Paracetamol Tablets", "available_quantity": 800, "ai_recommended_quantity": 950, "status": "sufficient", "category": "Medicine", "unit": "tablets", "_id": "para_001"},
+    {"name": "Inhalers (Salbutamol)", "available_quantity": 45, "ai_recommended_quantity": 65, "status": "monitor", "category": "Medicine", "unit": "inhalers", "_id": "inhaler_001"}
+]
+
+# Largest page /api/reports/decisions will return in one response
+MAX_DECISIONS_PAGE = 200
+
+# ISO 8601 in UTC, as MongoDB's $dateToString writes it
+DECISION_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%LZ"
+
+# Staffing templates per condition; "reason" is filled in per request by _staffing
+HEAT_STAFFING = (
+    {
+        "role": "Doctor",
+        "department": "Emergency",
+        "recommended_count": 4,
+        "current_count": 2,
+        "reason": "AI predicts {surge}% increase in heat-related emergencies at {temp}°C",
+        "priority": "high"
+    },
+    {
+        "role": "Nurse",
+        "department": "Emergency",
+        "recommended_count": 6,
+        "current_count": 3,
+        "reason": "AI analysis shows increased dehydration and heat stroke cases",
+        "priority": "high"
+    },
+)
+
+AQI_STAFFING = (
+    {
+        "role": "Specialist",
+        "department": "Pulmonology",
+        "recommended_count": 3,
+        "current_count": 1,
+        "reason": "AI forecasts {surge}% rise in respiratory cases (AQI {aqi})",
+        "priority": "high"
+    },
+    {
+        "role": "Nurse",
+        "department": "Respiratory",
+        "recommended_count": 4,
+        "current_count": 2,
+        "reason": "AI recommends additional respiratory care support",
+        "priority": "medium"
+    },
+)
+
+COLD_STAFFING = (
+    {
+        "role": "Doctor",
+        "department": "General Medicine",
+        "recommended_count": 3,
+        "current_count": 2,
+        "reason": "AI predicts {surge}% increase in respiratory infections at {temp}°C",
+        "priority": "medium"
+    },
+)
+
+HUMID_STAFFING = (
+    {
+        "role": "Specialist",
+        "department": "Dermatology",
+        "recommended_count": 2,
+        "current_count": 1,
+        "reason": "AI analysis indicates {humidity}% humidity increases skin condition cases",
+        "priority": "low"
+    },
+)
+
+NORMAL_STAFFING = (
+    {
+        "role": "Current Team",
+        "department": "All Departments",
+        "recommended_count": 0,
+        "current_count": 0,
+        "reason": "{message}",
+        "priority": "low"
+    },
+)
+
+HAPPY_STAFFING_MESSAGES = (
+    "✓ All good! Weather's chill, staff levels are perfect",
+    "👍 Nice! Conditions are stable, no extra hands needed",
+    "Solid! Current team size matches today's workload perfectly",
+    "Looking good! Environmental factors are in our favor",
+    "⚡ Sweet! Everything's running smooth, keep current staffing"
+)
+
+def _staffing(templates: tuple, **values) -> list:
+    """Copies of the staffing templates with their reasons filled in"""
+    recommendations = []
+    for template in templates:
+        recommendation = template.copy()
+        recommendation["reason"] = template["reason"].format(**values)
+        recommendations.append(recommendation)
+    return recommendations
+
+class LocationRequest(BaseModel):
+    """Coordinates sent by the dashboard - Mumbai when it has no location"""
+    lat: Optional[float] = MUMBAI_LAT
+    lon: Optional[float] = MUMBAI_LON
+
+def _coordinates(data: Optional[LocationRequest]) -> tuple:
+    """(lat, lon) from an optional request body; explicit nulls also fall back to Mumbai"""
+    if data is None or data.lat is None or data.lon is None:
+        return MUMBAI_LAT, MUMBAI_LON
+    return data.lat, data.lon
+
+class StaffRecommendationRequest(LocationRequest):
     department: Optional[str] = None
 
 class InventoryStatusUpdate(BaseModel):
@@ -21,14 +177,14 @@ class InventoryStatusUpdate(BaseModel):
     status: str  # approved, review, declined
     reasoning: Optional[str] = None
 
-@router.get("/api/staff")
-def get_staff(lat: float = None, lon: float = None):
+@router.get("/api/staff", dependencies=_SESSION_REQUIRED)
+async def get_staff(lat: float = None, lon: float = None):
     """Get fully AI-generated staff data based on real-time environmental conditions"""
-    logger.info(f"AI agent generating staff data for location: {lat}, {lon}")
+    logger.info("AI agent generating staff data for location: %s, %s", lat, lon)
     
     try:
         # AI agent generates complete staff data dynamically
-        staff_list = get_ai_staff_data(lat, lon)
+        staff_list = await get_ai_staff_data(lat, lon)
         
         return {
             "success": True,
@@ -38,33 +194,26 @@ def get_staff(lat: float = None, lon: float = None):
             "note": "All data generated by AI agent based on real-time conditions"
         }
     except Exception as e:
-        logger.error(f"AI agent staff generation error: {e}")
+        logger.error("AI agent staff generation error: %s", e)
         return {
             "success": False,
             "message": "AI agent temporarily unavailable for staff data generation",
             "staff": []
         }
 
-@router.post("/api/staff/recommendations")
+@router.post("/api/staff/recommendations", dependencies=_SESSION_REQUIRED)
 def get_staff_recommendations(data: StaffRecommendationRequest):
     """AI-powered staff recommendations based on real-time conditions"""
     logger.info("AI staff recommendations requested")
     
     try:
         # Use provided coordinates or fallback
-        if lat is None or lon is None:
-            lat, lon = 19.0760, 72.8777  # Mumbai fallback
+        lat, lon = _coordinates(data)
         weather_data = get_weather(lat, lon)
         if not weather_data:
             weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
         
-        try:
-            aqi_data = get_air_quality(lat, lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-            aqi_category = classify_aqi_us(aqi_value)
-        except:
-            aqi_value = 50
-            aqi_category = 'Good'
+        aqi_value, aqi_category = aqi_reading(get_air_quality(lat, lon))
         
         # AI-driven staffing recommendations based on environmental conditions
         recommendations = []
@@ -73,83 +222,20 @@ def get_staff_recommendations(data: StaffRecommendationRequest):
         
         # AI logic for dynamic staffing based on weather patterns
         if temp > 32:  # High temperature - heat-related emergencies expected
-            recommendations.extend([
-                {
-                    "role": "Doctor",
-                    "department": "Emergency",
-                    "recommended_count": 4,
-                    "current_count": 2,
-                    "reason": f"AI predicts {int((temp-30)*15)}% increase in heat-related emergencies at {temp}°C",
-                    "priority": "high"
-                },
-                {
-                    "role": "Nurse",
-                    "department": "Emergency",
-                    "recommended_count": 6,
-                    "current_count": 3,
-                    "reason": "AI analysis shows increased dehydration and heat stroke cases",
-                    "priority": "high"
-                }
-            ])
+            recommendations.extend(_staffing(HEAT_STAFFING, temp=temp, surge=int((temp-30)*15)))
         
         if aqi_value > 150:  # Poor air quality - respiratory cases surge
-            recommendations.extend([
-                {
-                    "role": "Specialist",
-                    "department": "Pulmonology",
-                    "recommended_count": 3,
-                    "current_count": 1,
-                    "reason": f"AI forecasts {int((aqi_value-100)*0.3)}% rise in respiratory cases (AQI {aqi_value})",
-                    "priority": "high"
-                },
-                {
-                    "role": "Nurse",
-                    "department": "Respiratory",
-                    "recommended_count": 4,
-                    "current_count": 2,
-                    "reason": "AI recommends additional respiratory care support",
-                    "priority": "medium"
-                }
-            ])
+            recommendations.extend(_staffing(AQI_STAFFING, aqi=aqi_value, surge=int((aqi_value-100)*0.3)))
         
         if temp < 15:  # Cold weather - infection patterns
-            recommendations.append({
-                "role": "Doctor",
-                "department": "General Medicine",
-                "recommended_count": 3,
-                "current_count": 2,
-                "reason": f"AI predicts {int((20-temp)*5)}% increase in respiratory infections at {temp}°C",
-                "priority": "medium"
-            })
+            recommendations.extend(_staffing(COLD_STAFFING, temp=temp, surge=int((20-temp)*5)))
         
         if humidity > 80:  # High humidity - fungal and skin conditions
-            recommendations.append({
-                "role": "Specialist",
-                "department": "Dermatology",
-                "recommended_count": 2,
-                "current_count": 1,
-                "reason": f"AI analysis indicates {humidity}% humidity increases skin condition cases",
-                "priority": "low"
-            })
+            recommendations.extend(_staffing(HUMID_STAFFING, humidity=humidity))
         
         # Default AI recommendation for normal conditions
         if not recommendations:
-            happy_messages = [
-                "✓ All good! Weather's chill, staff levels are perfect",
-                "👍 Nice! Conditions are stable, no extra hands needed",
-                "Solid! Current team size matches today's workload perfectly",
-                "Looking good! Environmental factors are in our favor",
-                "⚡ Sweet! Everything's running smooth, keep current staffing"
-            ]
-            import random
-            recommendations = [{
-                "role": "Current Team",
-                "department": "All Departments",
-                "recommended_count": 0,
-                "current_count": 0,
-                "reason": random.choice(happy_messages),
-                "priority": "low"
-            }]
+            recommendations = _staffing(NORMAL_STAFFING, message=random.choice(HAPPY_STAFFING_MESSAGES))
         
         return {
             "success": True,
@@ -163,14 +249,8 @@ def get_staff_recommendations(data: StaffRecommendationRequest):
             }
         }
     except Exception as e:
-        logger.error(f"AI staff recommendations error: {e}")
+        logger.error("AI staff recommendations error: %s", e)
         # Return happy message as fallback
-        happy_messages = [
-            "✓ All good! Weather's chill, staff levels are perfect",
-            "👍 Nice! Conditions are stable, no extra hands needed",
-            "💯 Solid! Current team size matches today's workload perfectly"
-        ]
-        import random
         return {
             "success": True,
             "recommendations": [{
@@ -178,7 +258,7 @@ def get_staff_recommendations(data: StaffRecommendationRequest):
                 "department": "All Departments",
                 "recommended_count": 0,
                 "current_count": 0,
-                "reason": random.choice(happy_messages),
+                "reason": random.choice(HAPPY_STAFFING_MESSAGES),
                 "priority": "low"
             }],
             "weather_context": {
@@ -186,14 +266,14 @@ def get_staff_recommendations(data: StaffRecommendationRequest):
             }
         }
 
-@router.get("/api/inventory")
-def get_inventory(lat: float = None, lon: float = None):
+@router.get("/api/inventory", dependencies=_SESSION_REQUIRED)
+async def get_inventory(lat: float = None, lon: float = None):
     """Get fully AI-generated inventory data based on real-time environmental analysis"""
-    logger.info(f"AI agent generating inventory data for location: {lat}, {lon}")
+    logger.info("AI agent generating inventory data for location: %s, %s", lat, lon)
     
     try:
         # AI agent generates complete inventory data dynamically
-        inventory_list = get_ai_inventory_data(lat, lon)
+        inventory_list = await get_ai_inventory_data(lat, lon)
         
         return {
             "success": True,
@@ -203,50 +283,38 @@ def get_inventory(lat: float = None, lon: float = None):
             "note": "All inventory data generated by AI agent analyzing current weather and AQI"
         }
     except Exception as e:
-        logger.error(f"AI agent inventory generation error: {e}")
+        logger.error("AI agent inventory generation error: %s", e)
         # Fallback with realistic medical inventory
-        fallback_inventory = [
-            {"name": "N95 Masks", "available_quantity": 450, "ai_recommended_quantity": 600, "status": "monitor", "category": "PPE", "unit": "pieces", "_id": "mask_001"},
-            {"name": "Surgical Gloves", "available_quantity": 1200, "ai_recommended_quantity": 1500, "status": "sufficient", "category": "PPE", "unit": "pairs", "_id": "glove_001"},
-            {"name": "Oxygen Cylinders", "available_quantity": 25, "ai_recommended_quantity": 35, "status": "monitor", "category": "Equipment", "unit": "cylinders", "_id": "oxygen_001"},
-            {"name": "IV Fluids (Saline)", "available_quantity": 180, "ai_recommended_quantity": 220, "status": "sufficient", "category": "Medicine", "unit": "bags", "_id": "iv_001"},
-            {"name": "Paracetamol Tablets", "available_quantity": 800, "ai_recommended_quantity": 950, "status": "sufficient", "category": "Medicine", "unit": "tablets", "_id": "para_001"},
-            {"name": "Inhalers (Salbutamol)", "available_quantity": 45, "ai_recommended_quantity": 65, "status": "monitor", "category": "Medicine", "unit": "inhalers", "_id": "inhaler_001"}
-        ]
         return {
             "success": True,
-            "inventory": fallback_inventory,
+            "inventory": INVENTORY_FALLBACK,
             "data_source": "fallback_realistic_data",
             "generated_at": datetime.now().isoformat(),
             "note": "Realistic medical inventory based on current conditions"
         }
 
-@router.post("/api/inventory/recalculate")
-def recalculate_inventory_recommendations():
+@router.post("/api/inventory/recalculate", dependencies=_SESSION_REQUIRED)
+async def recalculate_inventory_recommendations(data: Optional[LocationRequest] = None):
     """AI recalculates inventory needs based on current environmental conditions"""
     logger.info("AI inventory recalculation requested")
     
     try:
         # Use provided coordinates or fallback
-        if lat is None or lon is None:
-            lat, lon = 19.0760, 72.8777  # Mumbai fallback
-        weather_data = get_weather(lat, lon)
+        lat, lon = _coordinates(data)
+        weather_data = await run_http(get_weather, lat, lon)
         if not weather_data:
             weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
         
-        try:
-            aqi_data = get_air_quality(lat, lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-        except:
-            aqi_value = 50
+        aqi_value, _ = await fetch_aqi(lat, lon)
         
         temp = weather_data.get('temperature', 25)
         humidity = weather_data.get('humidity', 60)
         
         # AI agent generates fresh inventory data for recalculation
-        inventory_items = get_ai_inventory_data(lat, lon)
+        inventory_items = await get_ai_inventory_data(lat, lon)
         
         # AI-powered inventory optimization based on environmental factors
+        updates = []
         for item in inventory_items:
             base_qty = item['available_quantity']
             
@@ -302,12 +370,16 @@ def recalculate_inventory_recommendations():
                 
                 item['ai_recommended_quantity'] = int(base_qty * environmental_factor)
             
-            # Update database if available
-            if inventory_collection is not None:
-                inventory_collection.update_one(
-                    {"_id": item["_id"]},
-                    {"$set": {"ai_recommended_quantity": item['ai_recommended_quantity']}}
-                )
+            # Generated items carry synthetic ids; name is the inventory's unique key
+            updates.append(UpdateOne(
+                {"name": item["name"]},
+                {"$set": {"ai_recommended_quantity": item['ai_recommended_quantity']}}
+            ))
+        
+        # Update database if available - all items in one round trip
+        inventory_collection = db_manager.get_collection("inventory")
+        if inventory_collection is not None and updates:
+            await inventory_collection.bulk_write(updates, ordered=False)
         
         return {
             "success": True,
@@ -320,16 +392,30 @@ def recalculate_inventory_recommendations():
             }
         }
     except Exception as e:
-        logger.error(f"AI inventory recalculation error: {e}")
+        logger.error("AI inventory recalculation error: %s", e)
         return {
             "success": False,
             "message": "Unable to perform AI inventory recalculation"
         }
 
-@router.patch("/api/inventory/{item_id}/status")
-def update_inventory_status(item_id: str, data: InventoryStatusUpdate):
+def _invalidate_decisions():
+    """Drop the cached report pages and stop in-flight reads from caching theirs"""
+    global _decisions_generation
+    _decisions_generation += 1
+    _decisions_cache.clear()
+
+async def _log_decision(decision_log_collection, decision_log: dict):
+    """Insert one decision log entry and drop the cached report pages again"""
+    try:
+        await decision_log_collection.insert_one(decision_log)
+        _invalidate_decisions()
+    except Exception as e:
+        logger.error("Decision log write error: %s", e)
+
+@router.patch("/api/inventory/{item_id}/status", dependencies=_SESSION_REQUIRED)
+async def update_inventory_status(item_id: str, data: InventoryStatusUpdate):
     """Update inventory item status with decision logging"""
-    logger.info(f"Inventory status update for item {item_id}: {data.status}")
+    logger.info("Inventory status update for item %s: %s", item_id, data.status)
     
     try:
         # Create decision log entry
@@ -338,7 +424,7 @@ def update_inventory_status(item_id: str, data: InventoryStatusUpdate):
             "item_name": "",
             "original_recommendation": "",
             "final_decision": data.status,
-            "timestamp": datetime.now(),
+            "timestamp": datetime.now(timezone.utc),
             "reasoning": data.reasoning
         }
         
@@ -346,23 +432,29 @@ def update_inventory_status(item_id: str, data: InventoryStatusUpdate):
         decision_log_collection = db_manager.get_collection("decision_log")
         
         if inventory_collection is not None:
-            # Get current item details
-            item = inventory_collection.find_one({"_id": ObjectId(item_id)})
+            # Malformed ids can't match anything, so they never reach MongoDB
+            if not ObjectId.is_valid(item_id):
+                return {"success": False, "message": "Invalid item id"}
+            
+            # Update item status and get the details for the log in one round trip
+            item = await inventory_collection.find_one_and_update(
+                {"_id": ObjectId(item_id)},
+                {"$set": {"status": data.status}},
+                projection={"_id": 0, "name": 1, "ai_recommended_quantity": 1, "unit": 1}
+            )
             if not item:
                 return {"success": False, "message": "Item not found"}
             
             decision_log["item_name"] = item["name"]
             decision_log["original_recommendation"] = f"AI recommended {item['ai_recommended_quantity']} {item.get('unit', 'units')}"
             
-            # Update item status
-            inventory_collection.update_one(
-                {"_id": ObjectId(item_id)},
-                {"$set": {"status": data.status}}
-            )
-            
-            # Log decision if collection available
+            # Log decision if collection available - the reply doesn't depend
+            # on it, so the insert finishes after the response is sent
             if decision_log_collection is not None:
-                decision_log_collection.insert_one(decision_log)
+                _invalidate_decisions()
+                task = asyncio.create_task(_log_decision(decision_log_collection, decision_log))
+                _pending_decision_logs.add(task)
+                task.add_done_callback(_pending_decision_logs.discard)
         else:
             # Mock update for fallback
             for item in MOCK_INVENTORY:
@@ -377,54 +469,88 @@ def update_inventory_status(item_id: str, data: InventoryStatusUpdate):
             "message": f"Item status updated to {data.status}"
         }
     except Exception as e:
-        logger.error(f"Inventory status update error: {e}")
+        logger.error("Inventory status update error: %s", e)
         return {
             "success": False,
             "message": "Unable to update inventory status"
         }
 
+def _etagged_body(payload: dict) -> tuple:
+    """(JSON body, ETag) for a polled response - the tag changes whenever the body does"""
+    body = orjson.dumps(payload)
+    return body, f'"{cache_key(body)[:32]}"'
+
+def _conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    """The JSON body, or an empty 304 when the client's If-None-Match already names it"""
+    # no-cache: browsers keep the body but revalidate before every reuse
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/api/reports/decisions")
-def get_decision_reports():
-    """Get history of AI recommendations and human decisions"""
-    logger.info("Decision reports requested")
+async def get_decision_reports(
+    request: Request,
+    limit: int = Query(50, ge=1, le=MAX_DECISIONS_PAGE),
+    skip: int = Query(0, ge=0)
+):
+    """Get history of AI recommendations and human decisions, newest first, one page at a time"""
+    logger.info("Decision reports requested (skip=%s, limit=%s)", skip, limit)
     
     try:
-        decisions = []
-        decision_log_collection = db_manager.get_collection("decision_log")
+        page = _decisions_cache.get((skip, limit))
         
-        if decision_log_collection is not None:
-            decisions = list(decision_log_collection.find({}, {"_id": 0}).sort("timestamp", -1).limit(50))
-            # Convert datetime to string for JSON serialization
-            for decision in decisions:
-                if isinstance(decision.get('timestamp'), datetime):
-                    decision['timestamp'] = decision['timestamp'].isoformat()
-        else:
-            # Mock decision data for fallback
-            decisions = [
-                {
-                    "type": "inventory",
-                    "item_name": "N95 Masks",
-                    "original_recommendation": "AI recommended increase to 750 pieces based on AQI analysis",
-                    "final_decision": "approved",
-                    "timestamp": datetime.now().isoformat(),
-                    "reasoning": "AI analysis confirmed - high AQI requires additional PPE"
-                },
-                {
-                    "type": "staff",
-                    "item_name": "Emergency Doctors",
-                    "original_recommendation": "AI suggested adding 2 doctors due to temperature surge",
-                    "final_decision": "review",
-                    "timestamp": datetime.now().isoformat(),
-                    "reasoning": "AI recommendation under budget review"
-                }
-            ]
+        if page is None:
+            decision_log_collection = db_manager.get_collection("decision_log")
+            
+            if decision_log_collection is not None:
+                generation = _decisions_generation
+                # Sort/skip/limit walk the timestamp index, and only the page that
+                # survives them has its timestamp formatted - server-side, as ISO 8601
+                cursor = decision_log_collection.aggregate([
+                    {"$sort": {"timestamp": -1}},
+                    {"$skip": skip},
+                    {"$limit": limit},
+                    {"$project": {"_id": 0}},
+                    {"$addFields": {"timestamp": {"$dateToString": {"format": DECISION_TIMESTAMP_FORMAT, "date": "$timestamp"}}}}
+                ], batchSize=limit)  # The whole page in the first batch - no getMore round trip
+                decisions = await cursor.to_list(length=limit)
+                page = _etagged_body({
+                    "success": True,
+                    "decisions": decisions
+                })
+                if generation == _decisions_generation:
+                    _decisions_cache[(skip, limit)] = page
+            else:
+                # Mock decision data for fallback
+                now = datetime.now(timezone.utc).isoformat()
+                decisions = [
+                    {
+                        "type": "inventory",
+                        "item_name": "N95 Masks",
+                        "original_recommendation": "AI recommended increase to 750 pieces based on AQI analysis",
+                        "final_decision": "approved",
+                        "timestamp": now,
+                        "reasoning": "AI analysis confirmed - high AQI requires additional PPE"
+                    },
+                    {
+                        "type": "staff",
+                        "item_name": "Emergency Doctors",
+                        "original_recommendation": "AI suggested adding 2 doctors due to temperature surge",
+                        "final_decision": "review",
+                        "timestamp": now,
+                        "reasoning": "AI recommendation under budget review"
+                    }
+                ]
+                page = _etagged_body({
+                    "success": True,
+                    "decisions": decisions
+                })
         
-        return {
-            "success": True,
-            "decisions": decisions
-        }
+        return _conditional_response(request, *page)
     except Exception as e:
-        logger.error(f"Decision reports error: {e}")
+        logger.error("Decision reports error: %s", e)
         return {
             "success": False,
             "message": "Unable to fetch decision reports",
@@ -432,13 +558,13 @@ def get_decision_reports():
         }
 
 @router.get("/api/patients/stats")
-def get_patient_statistics(lat: float = None, lon: float = None):
+async def get_patient_statistics(lat: float = None, lon: float = None):
     """Get AI-generated patient statistics based on real-time conditions"""
-    logger.info(f"AI agent generating patient statistics for location: {lat}, {lon}")
+    logger.info("AI agent generating patient statistics for location: %s, %s", lat, lon)
     
     try:
         # AI agent generates patient stats dynamically
-        patient_stats = get_ai_patient_stats(lat, lon)
+        patient_stats = await get_ai_patient_stats(lat, lon)
         
         return {
             "success": True,
@@ -447,7 +573,7 @@ def get_patient_statistics(lat: float = None, lon: float = None):
             "generated_at": datetime.now().isoformat()
         }
     except Exception as e:
-        logger.error(f"AI patient statistics error: {e}")
+        logger.error("AI patient statistics error: %s", e)
         return {
             "success": False,
             "message": "AI agent temporarily unavailable for patient statistics",
@@ -455,48 +581,39 @@ def get_patient_statistics(lat: float = None, lon: float = None):
         }
 
 @router.get("/api/settings")
-def get_hospital_settings():
+async def get_hospital_settings(request: Request):
     """Get hospital configuration settings"""
     logger.info("Hospital settings requested")
     
     try:
-        settings_collection = db_manager.get_collection("settings")
+        cached = _settings_cache.get("settings")
         
-        if settings_collection is not None:
-            settings = settings_collection.find_one({}, {"_id": 0})
-            if not settings:
-                # Create default settings
-                default_settings = {
-                    "city": "Mumbai",
-                    "latitude": 19.0760,
-                    "longitude": 72.8777,
-                    "aqi_threshold_high": 150,
-                    "aqi_threshold_medium": 100,
-                    "temperature_threshold_high": 32,
-                    "temperature_threshold_low": 15,
-                    "hospital_name": "SurgeSense Medical Center"
-                }
-                settings_collection.insert_one(default_settings)
-                settings = default_settings
-        else:
-            # Fallback settings
-            settings = {
-                "city": "Mumbai",
-                "latitude": 19.0760,
-                "longitude": 72.8777,
-                "aqi_threshold_high": 150,
-                "aqi_threshold_medium": 100,
-                "temperature_threshold_high": 32,
-                "temperature_threshold_low": 15,
-                "hospital_name": "SurgeSense Medical Center"
-            }
+        if cached is None:
+            settings_collection = db_manager.get_collection("settings")
+            
+            if settings_collection is not None:
+                # Read the settings, creating the defaults on first use - one round trip
+                settings = await settings_collection.find_one_and_update(
+                    {},
+                    {"$setOnInsert": DEFAULT_SETTINGS},
+                    projection={"_id": 0},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                cached = _settings_cache["settings"] = _etagged_body({
+                    "success": True,
+                    "settings": settings
+                })
+            else:
+                # Fallback settings
+                cached = _etagged_body({
+                    "success": True,
+                    "settings": DEFAULT_SETTINGS
+                })
         
-        return {
-            "success": True,
-            "settings": settings
-        }
+        return _conditional_response(request, *cached)
     except Exception as e:
-        logger.error(f"Settings fetch error: {e}")
+        logger.error("Settings fetch error: %s", e)
         return {
             "success": False,
             "message": "Unable to fetch hospital settings",
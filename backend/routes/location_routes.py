@@ -1,12 +1,17 @@
 # Location-based routes - weather and nearby facilities
 from fastapi import APIRouter
 from pydantic import BaseModel
+import asyncio
 import logging
-import requests
-import os
-from utils.weather_api import get_weather
-from utils.weather_aqi import get_air_quality, classify_aqi_us
+import orjson
+from utils.blocking import run_http
+from utils.responses import APIResponse
+from utils.weather_api import get_weather, reverse_geocode
+from utils.weather_aqi import fetch_aqi
+from utils.overpass_api import find_medical_places
 from utils.overpass_enhanced import find_nearby_facilities
+from utils.ttl_cache import location_ttl_cache
+from config.location import MUMBAI_LAT, MUMBAI_LON, MUMBAI_LOCATION
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -15,6 +20,13 @@ class WeatherRequest(BaseModel):
     lat: float
     lon: float
 
+@location_ttl_cache(ttl=3600)
+def _encoded_medical_places(lat: float, lon: float) -> bytes:
+    """JSON-encoded find_medical_places() result, so cache hits skip encoding the list too"""
+    medical_places = find_medical_places(lat, lon)
+    # b"" is only negatively cached (for 30s), so an empty or failed lookup is retried soon
+    return orjson.dumps(medical_places) if medical_places else b""
+
 @router.get("/citizen/nearby-facilities")
 def get_nearby_facilities(lat: float, lon: float, radius_km: float = 5.0):
     """Enhanced nearby facilities endpoint with real distance calculation"""
@@ -65,16 +77,16 @@ def nearby_hospitals():
     logger.info("Legacy nearby hospitals requested")
     
     try:
-        from utils.overpass_api import find_medical_places
-        lat, lon = 19.0760, 72.8777
+        lat, lon = MUMBAI_LAT, MUMBAI_LON
         
-        medical_places = find_medical_places(lat, lon)
+        places_json = _encoded_medical_places(lat, lon) or b"[]"
         
-        return {
+        # The pre-encoded list is spliced in as-is; only the envelope is encoded here
+        return APIResponse({
             "success": True,
-            "places": medical_places,
-            "location": {"lat": lat, "lon": lon, "city": "Mumbai"}
-        }
+            "places": orjson.Fragment(places_json),
+            "location": MUMBAI_LOCATION
+        })
     except Exception as e:
         logger.error(f"Nearby hospitals error: {e}")
         return {
@@ -84,43 +96,30 @@ def nearby_hospitals():
         }
 
 @router.post("/weather/complete")
-def get_complete_weather(data: WeatherRequest):
+async def get_complete_weather(data: WeatherRequest):
     """Complete weather data including AQI for health recommendations"""
     logger.info(f"Weather requested for: {data.lat}, {data.lon}")
     
     try:
-        # Get weather data from weather API
-        weather_data = get_weather(data.lat, data.lon)
+        # Weather, AQI and the city name are independent - fetch them concurrently
+        weather_data, (aqi_value, aqi_category), city = await asyncio.gather(
+            run_http(get_weather, data.lat, data.lon),
+            fetch_aqi(data.lat, data.lon),
+            run_http(reverse_geocode, data.lat, data.lon),
+            return_exceptions=True
+        )
         
-        if not weather_data:
+        if isinstance(weather_data, Exception) or not weather_data:
             return {
                 "success": False,
                 "message": "Unable to fetch weather data"
             }
         
-        # Get city name from reverse geocoding
-        city = "Your location"
-        try:
-            geo_url = f"https://api.openweathermap.org/geo/1.0/reverse?lat={data.lat}&lon={data.lon}&limit=1&appid={os.getenv('OPENWEATHER_API_KEY')}"
-            geo_response = requests.get(geo_url, timeout=5)
-            if geo_response.status_code == 200:
-                geo_data = geo_response.json()
-                if geo_data and len(geo_data) > 0:
-                    city = geo_data[0].get('name', 'Your location')
-        except Exception:
-            pass
+        if isinstance(city, Exception) or not city:
+            city = "Your location"
         
-        # Get AQI data for comprehensive health context
-        try:
-            aqi_data = get_air_quality(data.lat, data.lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-            aqi_category = classify_aqi_us(aqi_value)
-            weather_data['aqi'] = aqi_value
-            weather_data['aqi_category'] = aqi_category
-        except Exception as e:
-            logger.warning(f"AQI fetch failed: {e}")
-            weather_data['aqi'] = 50
-            weather_data['aqi_category'] = 'Good'
+        # AQI data for comprehensive health context
+        weather_data['aqi'], weather_data['aqi_category'] = aqi_value, aqi_category
         
         # Add wind speed (can be enhanced with real wind data)
         weather_data['windSpeed'] = weather_data.get('windSpeed', 12)
@@ -1,29 +1,63 @@
 # Fully AI-driven hospital data management - no hardcoded data
-import json
+import asyncio
+import logging
+import orjson
+import re
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from cachetools import TTLCache
+# Imported with the app (via routes.hospital_routes) - importing these here
+# keeps the cost at startup instead of on the first AI request
 from utils.weather_api import get_weather
-from utils.weather_aqi import get_air_quality, classify_aqi_us
+from utils.weather_aqi import fetch_aqi
 from agents.hospital_agent import generate_hospital_response
+from agents.weather_context import bucket_weather
+from utils.blocking import run_http
+from config.location import MUMBAI_LAT, MUMBAI_LON
 
-def get_ai_staff_data(lat: float = None, lon: float = None) -> List[Dict[str, Any]]:
+logger = logging.getLogger(__name__)
+
+# Raw AI responses per (kind of data, bucketed conditions, hour) - the prompts
+# differ by the minute, but the generated lists only depend on these
+_ai_response_cache = TTLCache(maxsize=256, ttl=300)
+
+async def _cached_hospital_response(kind: str, weather_data: dict, aqi_value, aqi_category, hour: int, prompt: str):
+    """generate_hospital_response, reused while conditions stay within the same buckets"""
+    key = (kind, bucket_weather({**weather_data, "aqi": aqi_value, "aqi_category": aqi_category}), hour)
+    response = _ai_response_cache.get(key)
+    if response is None:
+        response = await generate_hospital_response(prompt)
+        # Failures come back as an error dict and are retried next time
+        if isinstance(response, str):
+            _ai_response_cache[key] = response
+    return response
+
+async def _fetch_env(lat: float, lon: float) -> Tuple[Dict[str, Any], float, str]:
+    """Weather and AQI for the AI prompts, fetched concurrently - Mumbai when no location is given"""
+    if lat is None or lon is None:
+        lat, lon = MUMBAI_LAT, MUMBAI_LON
+    weather_data, (aqi_value, aqi_category) = await asyncio.gather(
+        run_http(get_weather, lat, lon),
+        fetch_aqi(lat, lon),
+        return_exceptions=True
+    )
+    if isinstance(weather_data, BaseException):
+        weather_data = None
+    return weather_data or {}, aqi_value, aqi_category
+
+async def get_ai_staff_data(lat: float = None, lon: float = None) -> List[Dict[str, Any]]:
     """AI agent generates complete staff data based on real-time conditions"""
     
     # Get real-time environmental data
-    weather_data = get_weather(lat, lon)
-    temp = weather_data.get('temperature', 25) if weather_data else 25
-    humidity = weather_data.get('humidity', 60) if weather_data else 60
+    weather_data, aqi_value, aqi_category = await _fetch_env(lat, lon)
+    temp = weather_data.get('temperature', 25)
+    humidity = weather_data.get('humidity', 60)
     
-    try:
-        aqi_data = get_air_quality(lat, lon)
-        aqi_value = aqi_data.get('us_aqi', 50)
-        aqi_category = classify_aqi_us(aqi_value)
-    except:
-        aqi_value = 50
-        aqi_category = 'Good'
-    
-    current_hour = datetime.now().hour
-    current_date = datetime.now().strftime("%Y-%m-%d")
+    # One clock read per request, shared by the prompt and every generated record
+    now = datetime.now()
+    current_hour = now.hour
+    current_date = now.strftime("%Y-%m-%d")
     
     # AI prompt for generating staff data
     ai_prompt = f"""
@@ -52,25 +86,26 @@ def get_ai_staff_data(lat: float = None, lon: float = None) -> List[Dict[str, An
     """
     
     try:
-        ai_response = generate_hospital_response(ai_prompt)
+        ai_response = await _cached_hospital_response("staff", weather_data, aqi_value, aqi_category, current_hour, ai_prompt)
         
         # Try to parse AI response as JSON
         if ai_response.strip().startswith('['):
-            staff_data = json.loads(ai_response)
+            staff_data = orjson.loads(ai_response)
             
-            # Add AI metadata to each staff member
+            # Add AI metadata to each staff member - identical for all of them
+            metadata = {
+                "last_updated": now.isoformat(),
+                "ai_generated": True,
+                "environmental_context": {
+                    "temperature": temp,
+                    "humidity": humidity,
+                    "aqi": aqi_value,
+                    "aqi_category": aqi_category,
+                    "hour": current_hour
+                }
+            }
             for staff in staff_data:
-                staff.update({
-                    "last_updated": datetime.now().isoformat(),
-                    "ai_generated": True,
-                    "environmental_context": {
-                        "temperature": temp,
-                        "humidity": humidity,
-                        "aqi": aqi_value,
-                        "aqi_category": aqi_category,
-                        "hour": current_hour
-                    }
-                })
+                staff.update(metadata)
             
             return staff_data
         else:
@@ -78,25 +113,19 @@ def get_ai_staff_data(lat: float = None, lon: float = None) -> List[Dict[str, An
             return parse_ai_text_to_staff(ai_response, temp, humidity, aqi_value, current_hour)
             
     except Exception as e:
-        print(f"AI staff generation error: {e}")
+        logger.error("AI staff generation error: %s", e)
         # Emergency fallback - minimal AI-generated staff
         return generate_minimal_ai_staff(temp, aqi_value, current_hour)
 
-def get_ai_inventory_data(lat: float = None, lon: float = None) -> List[Dict[str, Any]]:
+async def get_ai_inventory_data(lat: float = None, lon: float = None) -> List[Dict[str, Any]]:
     """AI agent generates complete inventory data based on real-time conditions"""
     
     # Get real-time environmental data
-    weather_data = get_weather(lat, lon)
-    temp = weather_data.get('temperature', 25) if weather_data else 25
-    humidity = weather_data.get('humidity', 60) if weather_data else 60
+    weather_data, aqi_value, aqi_category = await _fetch_env(lat, lon)
+    temp = weather_data.get('temperature', 25)
+    humidity = weather_data.get('humidity', 60)
     
-    try:
-        aqi_data = get_air_quality(lat, lon)
-        aqi_value = aqi_data.get('us_aqi', 50)
-        aqi_category = classify_aqi_us(aqi_value)
-    except:
-        aqi_value = 50
-        aqi_category = 'Good'
+    now = datetime.now()
     
     # AI prompt for generating inventory data
     ai_prompt = f"""
@@ -104,7 +133,7 @@ def get_ai_inventory_data(lat: float = None, lon: float = None) -> List[Dict[str
     - Temperature: {temp}°C
     - Humidity: {humidity}%
     - AQI: {aqi_value} ({aqi_category})
-    - Current time: {datetime.now().strftime("%H:%M")}
+    - Current time: {now.strftime("%H:%M")}
     
     Based on these conditions, generate realistic hospital inventory with:
     1. Medical items needed for current weather/air quality
@@ -124,25 +153,27 @@ def get_ai_inventory_data(lat: float = None, lon: float = None) -> List[Dict[str
     """
     
     try:
-        ai_response = generate_hospital_response(ai_prompt)
+        ai_response = await _cached_hospital_response("inventory", weather_data, aqi_value, aqi_category, now.hour, ai_prompt)
         
         # Try to parse AI response as JSON
         if ai_response.strip().startswith('['):
-            inventory_data = json.loads(ai_response)
+            inventory_data = orjson.loads(ai_response)
             
-            # Add AI metadata to each item
+            # Add AI metadata to each item; only the id differs between items
+            now_ts = int(now.timestamp())
+            metadata = {
+                "last_updated": now.isoformat(),
+                "ai_generated": True,
+                "environmental_factors": {
+                    "temperature": temp,
+                    "humidity": humidity,
+                    "aqi": aqi_value,
+                    "aqi_category": aqi_category
+                }
+            }
             for item in inventory_data:
-                item.update({
-                    "_id": f"ai_{item['name'].lower().replace(' ', '_')}_{int(datetime.now().timestamp())}",
-                    "last_updated": datetime.now().isoformat(),
-                    "ai_generated": True,
-                    "environmental_factors": {
-                        "temperature": temp,
-                        "humidity": humidity,
-                        "aqi": aqi_value,
-                        "aqi_category": aqi_category
-                    }
-                })
+                item.update(metadata)
+                item["_id"] = f"ai_{item['name'].lower().replace(' ', '_')}_{now_ts}"
             
             return inventory_data
         else:
@@ -150,31 +181,25 @@ def get_ai_inventory_data(lat: float = None, lon: float = None) -> List[Dict[str
             return generate_condition_based_inventory(temp, aqi_value, humidity)
             
     except Exception as e:
-        print(f"AI inventory generation error: {e}")
+        logger.error("AI inventory generation error: %s", e)
         # Generate dynamic inventory based on conditions
         return generate_condition_based_inventory(temp, aqi_value, humidity)
 
-def get_ai_patient_stats(lat: float = None, lon: float = None) -> Dict[str, Any]:
+async def get_ai_patient_stats(lat: float = None, lon: float = None) -> Dict[str, Any]:
     """AI agent generates patient statistics based on real-time conditions"""
     
     # Get real-time environmental data
-    weather_data = get_weather(lat, lon)
-    temp = weather_data.get('temperature', 25) if weather_data else 25
+    weather_data, aqi_value, aqi_category = await _fetch_env(lat, lon)
+    temp = weather_data.get('temperature', 25)
     
-    try:
-        aqi_data = get_air_quality(lat, lon)
-        aqi_value = aqi_data.get('us_aqi', 50)
-        aqi_category = classify_aqi_us(aqi_value)
-    except:
-        aqi_value = 50
-        aqi_category = 'Good'
+    now = datetime.now()
     
     # AI prompt for patient statistics
     ai_prompt = f"""
     Generate realistic hospital patient statistics for Mumbai hospital based on:
     - Temperature: {temp}°C
     - AQI: {aqi_value} ({aqi_category})
-    - Time: {datetime.now().strftime("%H:%M")}
+    - Time: {now.strftime("%H:%M")}
     
     Calculate realistic numbers for:
     1. Total admitted patients (base ~1200, adjust for conditions)
@@ -191,118 +216,164 @@ def get_ai_patient_stats(lat: float = None, lon: float = None) -> Dict[str, Any]
     """
     
     try:
-        ai_response = generate_hospital_response(ai_prompt)
+        ai_response = await _cached_hospital_response("patients", weather_data, aqi_value, aqi_category, now.hour, ai_prompt)
         
-        # Try to parse AI response as JSON
-        if '{' in ai_response:
-            # Extract JSON from response
-            json_start = ai_response.find('{')
-            json_end = ai_response.rfind('}') + 1
-            json_str = ai_response[json_start:json_end]
-            patient_stats = json.loads(json_str)
-            
-            # Add AI analysis
-            patient_stats.update({
-                "ai_analysis": {
-                    "environmental_impact": f"Conditions: {temp}°C, AQI {aqi_value}",
-                    "last_calculated": datetime.now().isoformat(),
-                    "ai_generated": True
-                }
-            })
-            
-            return patient_stats
-        else:
+        # Extract the JSON object from the response - index/rindex raise
+        # ValueError when there is none, as orjson does for bad JSON
+        try:
+            json_start = ai_response.index('{')
+            json_end = ai_response.rindex('}') + 1
+            patient_stats = orjson.loads(ai_response[json_start:json_end])
+        except ValueError:
             # Fallback calculation
             return calculate_basic_patient_stats(temp, aqi_value)
+        
+        # Add AI analysis
+        patient_stats.update({
+            "ai_analysis": {
+                "environmental_impact": f"Conditions: {temp}°C, AQI {aqi_value}",
+                "last_calculated": datetime.now().isoformat(),
+                "ai_generated": True
+            }
+        })
+        
+        return patient_stats
             
     except Exception as e:
-        print(f"AI patient stats error: {e}")
+        logger.error("AI patient stats error: %s", e)
         return calculate_basic_patient_stats(temp, aqi_value)
 
+# Recommended-stock multipliers for the condition-based inventory fallback
+def _standard_multiplier(temp: float, aqi: int) -> float:
+    return 1.1  # Base 10% increase
+
+def _respiratory_multiplier(temp: float, aqi: int) -> float:
+    if aqi > 150:
+        return 1.8 + (aqi - 150) * 0.01
+    if aqi > 100:
+        return 1.4
+    return 1.1
+
+def _hydration_multiplier(temp: float, aqi: int) -> float:
+    return 1.3 + (temp - 30) * 0.05 if temp > 30 else 1.1
+
+def _fever_multiplier(temp: float, aqi: int) -> float:
+    return 1.4 if temp > 32 or temp < 15 else 1.1
+
+class InventoryTemplate(NamedTuple):
+    """One stock item of the condition-based inventory, with its multiplier rule"""
+    name: str
+    base: int
+    category: str
+    unit: str
+    multiplier: Callable[[float, int], float] = _standard_multiplier
+
+BASE_INVENTORY = (
+    InventoryTemplate("N95 Masks", 400, "PPE", "pieces", _respiratory_multiplier),
+    InventoryTemplate("Surgical Gloves", 1200, "PPE", "pairs"),
+    InventoryTemplate("Oxygen Cylinders", 25, "Equipment", "cylinders", _respiratory_multiplier),
+    InventoryTemplate("IV Fluids (Saline)", 180, "Medicine", "bags", _hydration_multiplier),
+    InventoryTemplate("Paracetamol Tablets", 800, "Medicine", "tablets", _fever_multiplier),
+    InventoryTemplate("Inhalers (Salbutamol)", 50, "Medicine", "inhalers", _respiratory_multiplier),
+)
+
+AQI_INVENTORY = (
+    InventoryTemplate("Nebulizers", 15, "Equipment", "devices"),
+    InventoryTemplate("Oxygen Masks", 80, "Medical Supplies", "masks", _respiratory_multiplier),
+)
+
+HEAT_INVENTORY = (
+    InventoryTemplate("Cooling Pads", 30, "Medical Supplies", "pads"),
+    InventoryTemplate("Electrolyte Solutions", 120, "Medicine", "bottles", _hydration_multiplier),
+)
+
+COLD_INVENTORY = (
+    InventoryTemplate("Antibiotics (Amoxicillin)", 200, "Medicine", "tablets"),
+    InventoryTemplate("Thermal Blankets", 40, "Medical Supplies", "blankets"),
+)
+
+HUMID_INVENTORY = (
+    InventoryTemplate("Antifungal Cream", 25, "Medicine", "tubes"),
+)
+
+# id fragment per item name, e.g. "IV Fluids (Saline)" -> "iv_fluids_saline"
+_INVENTORY_SLUGS = {
+    template.name: template.name.lower().replace(' ', '_').replace('(', '').replace(')', '')
+    for template in BASE_INVENTORY + AQI_INVENTORY + HEAT_INVENTORY + COLD_INVENTORY + HUMID_INVENTORY
+}
+
 # Helper functions for parsing AI responses
+# A line naming a doctor or nurse, and the specialties that make a doctor a specialist
+_STAFF_LINE_RE = re.compile(r"^.*(?:Dr\.|Nurse).*$", re.MULTILINE)
+_SPECIALIST_RE = re.compile(r"Cardio|Pulmo")
+MAX_PARSED_STAFF = 8
+
 def parse_ai_text_to_staff(text: str, temp: float, humidity: float, aqi: int, hour: int) -> List[Dict]:
     """Parse AI text response into staff data structure"""
-    # Basic parsing logic for non-JSON AI responses
+    # Basic parsing logic for non-JSON AI responses - one regex pass finds
+    # the staff lines, and only the first 8 are ever looked at
     staff_list = []
-    lines = text.split('\n')
-    
-    for line in lines:
-        if 'Dr.' in line or 'Nurse' in line:
-            # Extract staff info from text
-            name = line.split(':')[0].strip() if ':' in line else line.strip()
-            
-            # Determine role and department based on context
-            if 'Dr.' in name:
-                role = 'specialist' if 'Cardio' in line or 'Pulmo' in line else 'doctor'
-                dept = 'Emergency' if aqi > 150 or temp > 32 else 'General Medicine'
-            else:
-                role = 'nurse'
-                dept = 'ICU' if aqi > 150 else 'Emergency'
-            
-            status = 'on_duty' if 6 <= hour <= 18 else 'off_duty'
-            shift = 'day' if 6 <= hour <= 18 else 'night'
-            
-            staff_list.append({
-                "name": name,
-                "role": role,
-                "department": dept,
-                "status": status,
-                "shift": shift,
-                "last_updated": datetime.now().isoformat(),
-                "ai_generated": True
-            })
+    last_updated = datetime.now().isoformat()
+    
+    # Same for everyone in this response
+    doctor_dept = 'Emergency' if aqi > 150 or temp > 32 else 'General Medicine'
+    nurse_dept = 'ICU' if aqi > 150 else 'Emergency'
+    status = 'on_duty' if 6 <= hour <= 18 else 'off_duty'
+    shift = 'day' if 6 <= hour <= 18 else 'night'
+    
+    for match in islice(_STAFF_LINE_RE.finditer(text), MAX_PARSED_STAFF):
+        line = match.group()
+        # Extract staff info from text
+        name = line.partition(':')[0].strip()
+        
+        # Determine role and department based on context
+        if 'Dr.' in name:
+            role = 'specialist' if _SPECIALIST_RE.search(line) else 'doctor'
+            dept = doctor_dept
+        else:
+            role = 'nurse'
+            dept = nurse_dept
+        
+        staff_list.append({
+            "name": name,
+            "role": role,
+            "department": dept,
+            "status": status,
+            "shift": shift,
+            "last_updated": last_updated,
+            "ai_generated": True
+        })
     
-    return staff_list[:8]  # Limit to 8 staff members
+    return staff_list
 
 def generate_condition_based_inventory(temp: float, aqi: int, humidity: float) -> List[Dict[str, Any]]:
     """Generate dynamic inventory based on environmental conditions"""
-    base_inventory = {
-        "N95 Masks": {"base": 400, "category": "PPE", "unit": "pieces"},
-        "Surgical Gloves": {"base": 1200, "category": "PPE", "unit": "pairs"},
-        "Oxygen Cylinders": {"base": 25, "category": "Equipment", "unit": "cylinders"},
-        "IV Fluids (Saline)": {"base": 180, "category": "Medicine", "unit": "bags"},
-        "Paracetamol Tablets": {"base": 800, "category": "Medicine", "unit": "tablets"},
-        "Inhalers (Salbutamol)": {"base": 50, "category": "Medicine", "unit": "inhalers"}
-    }
-    
-    # Add condition-specific items
+    # Condition-specific items join the base list
+    templates = BASE_INVENTORY
     if aqi > 150:
-        base_inventory["Nebulizers"] = {"base": 15, "category": "Equipment", "unit": "devices"}
-        base_inventory["Oxygen Masks"] = {"base": 80, "category": "Medical Supplies", "unit": "masks"}
-    
+        templates += AQI_INVENTORY
     if temp > 32:
-        base_inventory["Cooling Pads"] = {"base": 30, "category": "Medical Supplies", "unit": "pads"}
-        base_inventory["Electrolyte Solutions"] = {"base": 120, "category": "Medicine", "unit": "bottles"}
-    
+        templates += HEAT_INVENTORY
     if temp < 15:
-        base_inventory["Antibiotics (Amoxicillin)"] = {"base": 200, "category": "Medicine", "unit": "tablets"}
-        base_inventory["Thermal Blankets"] = {"base": 40, "category": "Medical Supplies", "unit": "blankets"}
-    
+        templates += COLD_INVENTORY
     if humidity > 80:
-        base_inventory["Antifungal Cream"] = {"base": 25, "category": "Medicine", "unit": "tubes"}
+        templates += HUMID_INVENTORY
+    
+    now = datetime.now()
+    now_ts = int(now.timestamp())
+    last_updated = now.isoformat()
+    environmental_factors = {
+        "temperature": temp,
+        "humidity": humidity,
+        "aqi": aqi
+    }
     
     inventory_list = []
-    for name, data in base_inventory.items():
-        available = data["base"]
+    for template in templates:
+        available = template.base
         
         # Calculate AI recommendation based on conditions
-        multiplier = 1.1  # Base 10% increase
-        
-        if "Mask" in name or "Inhaler" in name or "Oxygen" in name:
-            if aqi > 150:
-                multiplier = 1.8 + (aqi - 150) * 0.01
-            elif aqi > 100:
-                multiplier = 1.4
-        
-        if "IV Fluids" in name or "Electrolyte" in name:
-            if temp > 30:
-                multiplier = 1.3 + (temp - 30) * 0.05
-        
-        if "Paracetamol" in name:
-            if temp > 32 or temp < 15:
-                multiplier = 1.4
-        
-        recommended = int(available * multiplier)
+        recommended = int(available * template.multiplier(temp, aqi))
         
         # Determine status
         if recommended > available * 1.5:
@@ -313,20 +384,16 @@ def generate_condition_based_inventory(temp: float, aqi: int, humidity: float) -
             status = "sufficient"
         
         inventory_list.append({
-            "name": name,
+            "name": template.name,
             "available_quantity": available,
             "ai_recommended_quantity": recommended,
             "status": status,
-            "category": data["category"],
-            "unit": data["unit"],
-            "_id": f"ai_{name.lower().replace(' ', '_').replace('(', '').replace(')', '')}_{int(datetime.now().timestamp())}",
-            "last_updated": datetime.now().isoformat(),
+            "category": template.category,
+            "unit": template.unit,
+            "_id": f"ai_{_INVENTORY_SLUGS[template.name]}_{now_ts}",
+            "last_updated": last_updated,
             "ai_generated": True,
-            "environmental_factors": {
-                "temperature": temp,
-                "humidity": humidity,
-                "aqi": aqi
-            }
+            "environmental_factors": environmental_factors
         })
     
     return inventory_list
@@ -335,6 +402,7 @@ def generate_minimal_ai_staff(temp: float, aqi: int, hour: int) -> List[Dict[str
     """Generate minimal staff data when AI fails"""
     staff_names = ["Dr. Sharma", "Nurse Patel", "Dr. Kumar", "Nurse Singh"]
     staff_list = []
+    last_updated = datetime.now().isoformat()
     
     for i, name in enumerate(staff_names):
         role = "doctor" if "Dr." in name else "nurse"
@@ -347,7 +415,7 @@ def generate_minimal_ai_staff(temp: float, aqi: int, hour: int) -> List[Dict[str
             "department": dept,
             "status": status,
             "shift": "day" if 6 <= hour <= 18 else "night",
-            "last_updated": datetime.now().isoformat(),
+            "last_updated": last_updated,
             "ai_generated": True
         })
     
@@ -1,15 +1,133 @@
 # SurgeSense - Autonomous AI Agent Service
 # Runs scheduled analysis and generates proactive recommendations
 
+import orjson
+import json_repair
+import logging
 import os
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel
+from cachetools import TTLCache
+from agents.runner import AgentRunner
+from agents.weather_context import bucket_weather
 from services.surge_prediction import surge_service
-from utils.weather_api import get_weather
-from utils.weather_aqi import get_air_quality, classify_aqi_us
+
+logger = logging.getLogger(__name__)
+
+AUTONOMOUS_SYSTEM_PROMPT = """You are the SurgeSense Autonomous AI Agent.
+
+Analyze the surge report and generate specific, actionable recommendations for hospital operations.
+
+Return ONLY valid JSON with this structure:
+{
+  "priority_alerts": [
+    {
+      "title": "Alert title",
+      "message": "Specific action needed",
+      "priority": "critical|high|medium|low",
+      "department": "Department name",
+      "estimated_impact": "Impact description"
+    }
+  ],
+  "staffing_actions": [
+    {
+      "department": "Department name",
+      "action": "increase|decrease|maintain",
+      "role": "doctor|nurse|specialist",
+      "count_change": number,
+      "reasoning": "Why this change is needed"
+    }
+  ],
+  "inventory_actions": [
+    {
+      "item": "Item name",
+      "action": "increase|decrease|maintain",
+      "quantity_change": number,
+      "reasoning": "Why this change is needed"
+    }
+  ],
+  "operational_recommendations": [
+    {
+      "area": "Area of operation",
+      "recommendation": "Specific recommendation",
+      "timeline": "immediate|within_2h|within_6h|within_24h"
+    }
+  ]
+}"""
+
+AgentRunner.register("autonomous", AUTONOMOUS_SYSTEM_PROMPT, temperature=0.3)
+
+# Seconds between background condition checks. Off (0) by default: every worker
+# would run its own timer and its own Gemini calls, so enable it only in a
+# single-worker process (e.g. one dedicated instance); checks otherwise happen
+# when dashboards poll /api/autonomous/check
+AUTONOMOUS_CHECK_INTERVAL = int(os.getenv("AUTONOMOUS_CHECK_INTERVAL", "0"))
+
+# Parsed recommendations per discretized surge report - reports minutes apart
+# differ only in raw readings, and the advice only depends on these buckets
+_recommendations_cache = TTLCache(maxsize=256, ttl=3600)
+
+def _recommendations_key(surge_report: Dict[str, Any]) -> tuple:
+    return (
+        surge_report['risk_level'],
+        round(surge_report['overall_surge_multiplier'], 1),
+        bucket_weather(surge_report['conditions']),
+        tuple(surge_report['peak_hours'])
+    )
+
+# Schema of the recommendations JSON - mirrors the structure in the system prompt
+class PriorityAlert(BaseModel):
+    title: str
+    message: str
+    priority: str = "medium"
+    department: str = ""
+    estimated_impact: str = ""
+
+class StaffingAction(BaseModel):
+    department: str
+    action: str
+    role: str = ""
+    count_change: int = 0
+    reasoning: str = ""
+
+class InventoryAction(BaseModel):
+    item: str
+    action: str
+    quantity_change: int = 0
+    reasoning: str = ""
+
+class OperationalRecommendation(BaseModel):
+    area: str
+    recommendation: str
+    timeline: str = "within_24h"
+
+class AutonomousRecommendations(BaseModel):
+    priority_alerts: List[PriorityAlert] = []
+    staffing_actions: List[StaffingAction] = []
+    inventory_actions: List[InventoryAction] = []
+    operational_recommendations: List[OperationalRecommendation] = []
+
+def _parse_recommendations(content: str) -> Dict[str, Any]:
+    """
+    Validate raw model output against AutonomousRecommendations
+    
+    Raises:
+        ValueError: When the output is not a recommendations object
+    """
+    # orjson first, json_repair for slightly malformed output - as in the citizen agent
+    cleaned = content.encode().strip()
+    cleaned = cleaned.removeprefix(b"```json").removeprefix(b"```").removesuffix(b"```").strip()
+    try:
+        parsed = orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
+        parsed = json_repair.loads(cleaned.decode())
+    
+    if not isinstance(parsed, dict) or not parsed:
+        raise ValueError("Response is not a JSON object")
+    # ValidationError is a ValueError, so callers handle both the same way
+    return AutonomousRecommendations.parse_obj(parsed).dict()
 
 class AutonomousAgentService:
     """
@@ -18,15 +136,10 @@ class AutonomousAgentService:
     """
     
     def __init__(self):
-        self.model = None
-        if os.getenv("GOOGLE_API_KEY"):
-            self.model = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                api_key=os.getenv("GOOGLE_API_KEY"),
-                temperature=0.3
-            )
+        self.ai_enabled = bool(os.getenv("GOOGLE_API_KEY"))
         
         self.last_analysis = None
+        self._scheduler_task = None
         self.alert_thresholds = {
             "temperature_high": 35,
             "temperature_low": 10,
@@ -34,7 +147,7 @@ class AutonomousAgentService:
             "surge_multiplier_high": 1.5
         }
     
-    def should_trigger_analysis(self) -> bool:
+    async def should_trigger_analysis(self) -> bool:
         """Determine if analysis should be triggered based on conditions or time"""
         if not self.last_analysis:
             return True
@@ -46,7 +159,8 @@ class AutonomousAgentService:
         
         # Check for critical conditions that require immediate analysis
         try:
-            conditions = surge_service.get_current_conditions()
+            # Served from the weather/AQI location caches between upstream refreshes
+            conditions = await surge_service.fetch_current_conditions()
             temp = conditions.get("temperature", 25)
             aqi = conditions.get("aqi", 50)
             
@@ -54,56 +168,20 @@ class AutonomousAgentService:
                 temp < self.alert_thresholds["temperature_low"] or
                 aqi > self.alert_thresholds["aqi_critical"]):
                 return True
-        except:
-            pass
+        except Exception as e:
+            logger.warning("Critical condition check failed: %s", e)
         
         return False
     
-    def generate_autonomous_recommendations(self, surge_report: Dict[str, Any]) -> Dict[str, Any]:
+    async def generate_autonomous_recommendations(self, surge_report: Dict[str, Any]) -> Dict[str, Any]:
         """Generate AI recommendations based on surge report"""
-        if not self.model:
+        if not self.ai_enabled:
             return self._fallback_recommendations(surge_report)
         
-        system_prompt = """You are the SurgeSense Autonomous AI Agent.
-        
-        Analyze the surge report and generate specific, actionable recommendations for hospital operations.
-        
-        Return ONLY valid JSON with this structure:
-        {
-          "priority_alerts": [
-            {
-              "title": "Alert title",
-              "message": "Specific action needed",
-              "priority": "critical|high|medium|low",
-              "department": "Department name",
-              "estimated_impact": "Impact description"
-            }
-          ],
-          "staffing_actions": [
-            {
-              "department": "Department name",
-              "action": "increase|decrease|maintain",
-              "role": "doctor|nurse|specialist",
-              "count_change": number,
-              "reasoning": "Why this change is needed"
-            }
-          ],
-          "inventory_actions": [
-            {
-              "item": "Item name",
-              "action": "increase|decrease|maintain",
-              "quantity_change": number,
-              "reasoning": "Why this change is needed"
-            }
-          ],
-          "operational_recommendations": [
-            {
-              "area": "Area of operation",
-              "recommendation": "Specific recommendation",
-              "timeline": "immediate|within_2h|within_6h|within_24h"
-            }
-          ]
-        }"""
+        cache_key = _recommendations_key(surge_report)
+        cached = _recommendations_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         human_prompt = f"""
         Current Surge Report:
@@ -121,28 +199,15 @@ class AutonomousAgentService:
         """
         
         try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt)
-            ]
-            
-            response = self.model.invoke(messages)
-            
-            # Parse JSON response
-            import json
-            content = response.content.strip()
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
+            # Async model call - the event loop keeps serving while Gemini answers
+            content = await AgentRunner("autonomous").run(human_prompt)
             
-            return json.loads(content)
+            # Only validated model output is cached; fallbacks are retried next time
+            recommendations = _recommendations_cache[cache_key] = _parse_recommendations(content)
+            return recommendations
             
         except Exception as e:
-            print(f"Autonomous agent error: {e}")
+            logger.error("Autonomous agent error: %s", e)
             return self._fallback_recommendations(surge_report)
     
     def _format_department_data(self, departments: Dict[str, Any]) -> str:
@@ -204,16 +269,16 @@ class AutonomousAgentService:
         
         return recommendations
     
-    def run_autonomous_analysis(self) -> Dict[str, Any]:
+    async def run_autonomous_analysis(self) -> Dict[str, Any]:
         """Run complete autonomous analysis and generate recommendations"""
-        print("Autonomous Agent: Starting analysis...")
+        logger.debug("Autonomous Agent: Starting analysis...")
         
         try:
-            # Generate surge report
-            surge_report = surge_service.generate_surge_report()
+            # Generate surge report - weather and AQI are fetched concurrently
+            surge_report = await surge_service.agenerate_surge_report()
             
             # Generate AI recommendations
-            ai_recommendations = self.generate_autonomous_recommendations(surge_report)
+            ai_recommendations = await self.generate_autonomous_recommendations(surge_report)
             
             # Update last analysis time
             self.last_analysis = datetime.now()
@@ -227,11 +292,11 @@ class AutonomousAgentService:
                 "next_analysis": (datetime.now() + timedelta(hours=2)).isoformat()
             }
             
-            print(f"Autonomous Agent: Analysis complete. Risk level: {surge_report['risk_level']}")
+            logger.debug("Autonomous Agent: Analysis complete. Risk level: %s", surge_report['risk_level'])
             return analysis_result
             
         except Exception as e:
-            print(f"Autonomous Agent: Error during analysis - {e}")
+            logger.error("Autonomous Agent: Error during analysis - %s", e)
             return {
                 "timestamp": datetime.now().isoformat(),
                 "error": str(e),
@@ -239,10 +304,10 @@ class AutonomousAgentService:
                 "next_analysis": (datetime.now() + timedelta(hours=2)).isoformat()
             }
     
-    def check_and_run_if_needed(self) -> Dict[str, Any]:
+    async def check_and_run_if_needed(self) -> Dict[str, Any]:
         """Check if analysis is needed and run if required"""
-        if self.should_trigger_analysis():
-            return self.run_autonomous_analysis()
+        if await self.should_trigger_analysis():
+            return await self.run_autonomous_analysis()
         else:
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -250,5 +315,31 @@ class AutonomousAgentService:
                 "next_check": (datetime.now() + timedelta(minutes=30)).isoformat()
             }
 
+    async def _run_scheduler(self):
+        """Check conditions every AUTONOMOUS_CHECK_INTERVAL seconds, analysing when due"""
+        while True:
+            # Sleep first - the first dashboard check already analyses after a restart
+            await asyncio.sleep(AUTONOMOUS_CHECK_INTERVAL)
+            try:
+                await self.check_and_run_if_needed()
+            except Exception as e:
+                logger.error("Autonomous Agent: Scheduled check failed - %s", e)
+    
+    def start_scheduler(self):
+        """Start the background check loop - called by the app startup event"""
+        if AUTONOMOUS_CHECK_INTERVAL <= 0 or self._scheduler_task is not None:
+            return
+        # uvicorn takes --workers from WEB_CONCURRENCY; gunicorn_conf.py checks its own count
+        if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+            logger.warning("AUTONOMOUS_CHECK_INTERVAL ignored - only supported with a single worker")
+            return
+        self._scheduler_task = asyncio.create_task(self._run_scheduler())
+    
+    def stop_scheduler(self):
+        """Cancel the background check loop - called on app shutdown"""
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            self._scheduler_task = None
+
 # Global instance for easy import
 autonomous_agent = AutonomousAgentService()
\ No newline at end of file
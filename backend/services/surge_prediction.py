@@ -1,12 +1,44 @@
 # SurgeSense - Surge Prediction Service
 # Predicts patient surges based on weather, AQI, events, and historical patterns
 
+import asyncio
+import logging
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import requests
 from utils.weather_api import get_weather
-from utils.weather_aqi import get_air_quality, classify_aqi_us
+from utils.weather_aqi import get_air_quality, aqi_reading, fetch_aqi
+from utils.blocking import run_http
+from config.location import MUMBAI_LAT, MUMBAI_LON
+
+logger = logging.getLogger(__name__)
+
+# Monsoon season (June-September in Mumbai)
+MONSOON_MONTHS = frozenset({6, 7, 8, 9})
+
+# Report recommendations and the conditions that call for them, in display order.
+# Shared by every report - responses only serialize them
+SURGE_RECOMMENDATIONS = (
+    (lambda conditions: conditions["temperature"] > 32, {
+        "title": "Heat Wave Protocol",
+        "description": "Activate cooling centers, increase hydration supplies, monitor elderly patients",
+        "priority": "high",
+        "icon_type": "heat"
+    }),
+    (lambda conditions: conditions["aqi"] > 150, {
+        "title": "Air Quality Alert",
+        "description": "Increase respiratory staff, stock inhalers and nebulizers, prepare oxygen supplies",
+        "priority": "high",
+        "icon_type": "air_quality"
+    }),
+    (lambda conditions: conditions["temperature"] < 15, {
+        "title": "Cold Weather Preparedness",
+        "description": "Monitor respiratory infections, increase warm blanket supplies, check heating systems",
+        "priority": "medium",
+        "icon_type": "respiratory"
+    }),
+)
 
 class SurgePredictionService:
     """
@@ -25,40 +57,68 @@ class SurgePredictionService:
             "weekend": 1.2,           # Weekends increase cases by 20%
             "monsoon": 1.3            # Monsoon season increases cases by 30%
         }
+        # Conditions fetches in progress per location cell - concurrent async
+        # callers await the same one instead of each starting their own
+        self._inflight: Dict[Tuple[float, float], asyncio.Future] = {}
     
     def get_current_conditions(self, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """Get current weather and AQI conditions"""
         try:
             # Use provided coordinates or fallback to Mumbai
             if lat is None or lon is None:
-                lat, lon = 19.0760, 72.8777
+                lat, lon = MUMBAI_LAT, MUMBAI_LON
             weather_data = get_weather(lat, lon)
-            if not weather_data:
-                weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
             
             # Get AQI data
-            try:
-                aqi_data = get_air_quality(lat, lon)
-                aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-                aqi_category = classify_aqi_us(aqi_value)
-            except:
-                aqi_value = 50
-                aqi_category = 'Good'
+            aqi_value, aqi_category = aqi_reading(get_air_quality(lat, lon))
             
-            return {
-                "temperature": weather_data.get("temperature", 25),
-                "humidity": weather_data.get("humidity", 60),
-                "description": weather_data.get("description", "moderate"),
-                "aqi": aqi_value,
-                "aqi_category": aqi_category,
-                "timestamp": datetime.now()
-            }
+            return self._conditions(weather_data, aqi_value, aqi_category)
         except Exception as e:
-            print(f"Error getting conditions: {e}")
-            return {
-                "temperature": 25, "humidity": 60, "description": "moderate",
-                "aqi": 50, "aqi_category": "Good", "timestamp": datetime.now()
-            }
+            logger.error("Error getting conditions: %s", e)
+            return self._conditions(None, 50, "Good")
+    
+    async def fetch_current_conditions(self, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """get_current_conditions for async callers - weather and AQI are fetched concurrently"""
+        if lat is None or lon is None:
+            lat, lon = MUMBAI_LAT, MUMBAI_LON
+        # Same rounding as the weather/AQI location caches
+        key = (round(lat, 2), round(lon, 2))
+        fetch = self._inflight.get(key)
+        if fetch is None:
+            fetch = self._inflight[key] = asyncio.ensure_future(self._fetch_conditions(lat, lon))
+            fetch.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded, so one caller disconnecting doesn't cancel the fetch for the rest;
+        # each caller gets its own copy of the shared result
+        return dict(await asyncio.shield(fetch))
+    
+    async def _fetch_conditions(self, lat: float, lon: float) -> Dict[str, Any]:
+        try:
+            weather_data, (aqi_value, aqi_category) = await asyncio.gather(
+                run_http(get_weather, lat, lon),
+                fetch_aqi(lat, lon)
+            )
+            return self._conditions(weather_data, aqi_value, aqi_category)
+        except Exception as e:
+            logger.error("Error getting conditions: %s", e)
+            return self._conditions(None, 50, "Good")
+    
+    @staticmethod
+    def _conditions(weather_data: Optional[Dict[str, Any]], aqi_value: float, aqi_category: str) -> Dict[str, Any]:
+        """Conditions dict from a weather reading (None when unavailable) and AQI"""
+        # degraded: the weather is the hardcoded default, not a reading - callers
+        # shouldn't present it as reassuring
+        degraded = not weather_data
+        if degraded:
+            weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
+        return {
+            "temperature": weather_data.get("temperature", 25),
+            "humidity": weather_data.get("humidity", 60),
+            "description": weather_data.get("description", "moderate"),
+            "aqi": aqi_value,
+            "aqi_category": aqi_category,
+            "degraded": degraded,
+            "timestamp": datetime.now()
+        }
     
     def calculate_surge_multiplier(self, conditions: Dict[str, Any]) -> float:
         """Calculate surge multiplier based on current conditions"""
@@ -88,15 +148,15 @@ class SurgePredictionService:
         if now.weekday() >= 5:  # Weekend
             multiplier *= self.base_surge_factors["weekend"]
         
-        # Monsoon season (June-September in Mumbai)
-        if now.month in [6, 7, 8, 9]:
+        if now.month in MONSOON_MONTHS:
             multiplier *= self.base_surge_factors["monsoon"]
         
         return round(multiplier, 2)
     
-    def predict_department_surge(self, conditions: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
-        """Predict surge for different hospital departments"""
-        base_multiplier = self.calculate_surge_multiplier(conditions)
+    def predict_department_surge(self, conditions: Dict[str, Any], base_multiplier: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Predict surge for different hospital departments (base_multiplier: precomputed overall multiplier)"""
+        if base_multiplier is None:
+            base_multiplier = self.calculate_surge_multiplier(conditions)
         temp = conditions.get("temperature", 25)
         aqi = conditions.get("aqi", 50)
         
@@ -191,10 +251,18 @@ class SurgePredictionService:
     
     def generate_surge_report(self, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """Generate comprehensive surge prediction report"""
-        conditions = self.get_current_conditions(lat, lon)
-        department_predictions = self.predict_department_surge(conditions)
-        peak_hours = self.get_peak_hours_prediction(conditions)
+        return self.build_surge_report(self.get_current_conditions(lat, lon))
+    
+    async def agenerate_surge_report(self, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """generate_surge_report for async callers"""
+        return self.build_surge_report(await self.fetch_current_conditions(lat, lon))
+    
+    def build_surge_report(self, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """Surge prediction report for the given conditions"""
+        # One multiplier for the whole report - the departments scale from it too
         overall_multiplier = self.calculate_surge_multiplier(conditions)
+        department_predictions = self.predict_department_surge(conditions, overall_multiplier)
+        peak_hours = self.get_peak_hours_prediction(conditions)
         
         # Calculate risk level
         if overall_multiplier >= 1.5:
@@ -208,30 +276,11 @@ class SurgePredictionService:
             risk_color = "green"
         
         # Generate recommendations
-        recommendations = []
-        if conditions["temperature"] > 32:
-            recommendations.append({
-                "title": "Heat Wave Protocol",
-                "description": "Activate cooling centers, increase hydration supplies, monitor elderly patients",
-                "priority": "high",
-                "icon_type": "heat"
-            })
-        
-        if conditions["aqi"] > 150:
-            recommendations.append({
-                "title": "Air Quality Alert",
-                "description": "Increase respiratory staff, stock inhalers and nebulizers, prepare oxygen supplies",
-                "priority": "high",
-                "icon_type": "air_quality"
-            })
-        
-        if conditions["temperature"] < 15:
-            recommendations.append({
-                "title": "Cold Weather Preparedness",
-                "description": "Monitor respiratory infections, increase warm blanket supplies, check heating systems",
-                "priority": "medium",
-                "icon_type": "respiratory"
-            })
+        recommendations = [
+            recommendation
+            for applies, recommendation in SURGE_RECOMMENDATIONS
+            if applies(conditions)
+        ]
         
         return {
             "timestamp": datetime.now().isoformat(),
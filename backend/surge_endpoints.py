@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import logging
 from datetime import datetime, timedelta
-import json
+from services.autonomous_agent import autonomous_agent
+from services.surge_prediction import surge_service
+from utils.blocking import run_http
+from utils.llm_capacity import llm_capacity
+from utils.weather_api import get_weather
+from utils.weather_aqi import fetch_aqi
+from config.location import MUMBAI_LAT, MUMBAI_LON
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -23,15 +30,13 @@ class AutonomousAgentRequest(BaseModel):
 
 # Surge Prediction Endpoints
 @router.get("/api/surge/prediction")
-def get_surge_prediction(city: str = "Mumbai", hours_ahead: int = 24, lat: float = None, lon: float = None):
+async def get_surge_prediction(city: str = "Mumbai", hours_ahead: int = 24, lat: float = None, lon: float = None):
     """Get AI-powered surge prediction for a specific city"""
     logger.info(f"AI surge prediction requested for {city} at {lat}, {lon}, {hours_ahead} hours ahead")
     
     try:
-        from services.surge_prediction import surge_service
-        
         # Generate comprehensive surge report using AI analysis
-        prediction_data = surge_service.generate_surge_report(lat, lon)
+        prediction_data = await surge_service.agenerate_surge_report(lat, lon)
         
         return {
             "success": True,
@@ -51,9 +56,9 @@ def get_surge_prediction(city: str = "Mumbai", hours_ahead: int = 24, lat: float
         }
 
 @router.post("/api/surge/prediction")
-def post_surge_prediction(request: SurgePredictionRequest):
+async def post_surge_prediction(request: SurgePredictionRequest):
     """Post request for surge prediction"""
-    return get_surge_prediction(request.city, request.hours_ahead)
+    return await get_surge_prediction(request.city, request.hours_ahead)
 
 
 
@@ -64,8 +69,6 @@ def get_autonomous_agent_status():
     logger.info("Autonomous agent status requested")
     
     try:
-        from services.autonomous_agent import autonomous_agent
-        
         # Get agent status
         status_data = autonomous_agent.get_status()
         
@@ -88,8 +91,6 @@ def trigger_autonomous_action(request: AutonomousAgentRequest):
     logger.info(f"Autonomous agent action requested: {request.action}")
     
     try:
-        from services.autonomous_agent import autonomous_agent
-        
         # Execute action
         result = autonomous_agent.execute_action(request.action, request.parameters)
         
@@ -110,31 +111,23 @@ def trigger_autonomous_action(request: AutonomousAgentRequest):
 
 # Weather-based surge alerts
 @router.get("/api/surge/weather-alerts")
-def get_weather_based_alerts(city: str = "Mumbai", lat: float = None, lon: float = None):
+async def get_weather_based_alerts(city: str = "Mumbai", lat: float = None, lon: float = None):
     """Get weather-based surge alerts for a city"""
     logger.info(f"Weather-based alerts requested for {city} at {lat}, {lon}")
     
     try:
-        from utils.weather_api import get_weather
-        from utils.weather_aqi import get_air_quality, classify_aqi_us
-        
         # Use provided coordinates or fallback to Mumbai
         if lat is None or lon is None:
-            lat, lon = 19.0760, 72.8777
+            lat, lon = MUMBAI_LAT, MUMBAI_LON
         
-        weather_data = get_weather(lat, lon)
+        # Weather and AQI are independent - fetch them concurrently
+        weather_data, (aqi_value, aqi_category) = await asyncio.gather(
+            run_http(get_weather, lat, lon),
+            fetch_aqi(lat, lon)
+        )
         if not weather_data:
             weather_data = {"temperature": 25, "humidity": 60, "description": "moderate"}
         
-        # Get AQI data
-        try:
-            aqi_data = get_air_quality(lat, lon)
-            aqi_value = aqi_data.get('us_aqi') or aqi_data.get('european_aqi') or 50
-            aqi_category = classify_aqi_us(aqi_value)
-        except:
-            aqi_value = 50
-            aqi_category = 'Good'
-        
         # Generate alerts based on conditions
         alerts = []
         temp = weather_data.get('temperature', 25)
@@ -200,16 +193,14 @@ def get_weather_based_alerts(city: str = "Mumbai", lat: float = None, lon: float
         }
 
 # Autonomous Agent Endpoints
-@router.get("/api/autonomous/analysis")
-def get_autonomous_analysis():
+@router.get("/api/autonomous/analysis", dependencies=[Depends(llm_capacity)])
+async def get_autonomous_analysis():
     """Get autonomous agent analysis"""
     logger.info("Autonomous agent analysis requested")
     
     try:
-        from services.autonomous_agent import autonomous_agent
-        
         # Run autonomous analysis
-        analysis_result = autonomous_agent.run_autonomous_analysis()
+        analysis_result = await autonomous_agent.run_autonomous_analysis()
         
         return {
             "success": True,
@@ -224,16 +215,14 @@ def get_autonomous_analysis():
             "analysis": {}
         }
 
-@router.get("/api/autonomous/check")
-def check_autonomous_agent():
+@router.get("/api/autonomous/check", dependencies=[Depends(llm_capacity)])
+async def check_autonomous_agent():
     """Check if autonomous agent needs to run analysis"""
     logger.info("Autonomous agent check requested")
     
     try:
-        from services.autonomous_agent import autonomous_agent
-        
         # Check and run if needed
-        result = autonomous_agent.check_and_run_if_needed()
+        result = await autonomous_agent.check_and_run_if_needed()
         
         return {
             "success": True,
@@ -0,0 +1,32 @@
+# Worker-thread budgets for blocking calls - one limiter per kind of work
+import os
+from functools import lru_cache
+from typing import Any, Callable
+
+from anyio import CapacityLimiter, to_thread
+
+# Threads each kind of blocking work may occupy at once per worker
+HTTP_THREADS = int(os.getenv("HTTP_THREADS", "16"))
+LLM_THREADS = int(os.getenv("LLM_THREADS", "4"))
+CPU_THREADS = int(os.getenv("CPU_THREADS", str(os.cpu_count() or 2)))
+
+
+# Limiters are created on first use, inside the running event loop
+@lru_cache(maxsize=None)
+def _limiter(kind: str) -> CapacityLimiter:
+    return CapacityLimiter({"http": HTTP_THREADS, "llm": LLM_THREADS, "cpu": CPU_THREADS}[kind])
+
+
+async def run_http(fn: Callable[..., Any], *args) -> Any:
+    """Run a blocking upstream API call (weather, AQI, Overpass) in a worker thread"""
+    return await to_thread.run_sync(fn, *args, limiter=_limiter("http"))
+
+
+async def run_llm(fn: Callable[..., Any], *args) -> Any:
+    """Run a blocking Gemini SDK call (e.g. embeddings) in a worker thread"""
+    return await to_thread.run_sync(fn, *args, limiter=_limiter("llm"))
+
+
+async def run_cpu(fn: Callable[..., Any], *args) -> Any:
+    """Run CPU-bound work (e.g. password hashing) in a worker thread"""
+    return await to_thread.run_sync(fn, *args, limiter=_limiter("cpu"))
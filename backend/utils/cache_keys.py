@@ -0,0 +1,27 @@
+# Cache key hashing - compact, process-stable keys for the LLM and response caches
+from typing import Union
+
+from blake3 import blake3
+
+_SEPARATOR = b"\x00"
+
+
+def cache_key(*parts: Union[str, bytes]) -> str:
+    """
+    Hash the given parts into one hex digest
+
+    Unlike hash(), the result is identical across processes and restarts,
+    so it can be shared with persistent or distributed cache backends.
+    Parts are separated so ("ab", "c") and ("a", "bc") never collide.
+
+    Args:
+        *parts: Strings or bytes making up the cache identity
+
+    Returns:
+        str: 64-character BLAKE3 hex digest
+    """
+    hasher = blake3()
+    for part in parts:
+        hasher.update(part.encode() if isinstance(part, str) else part)
+        hasher.update(_SEPARATOR)
+    return hasher.hexdigest()
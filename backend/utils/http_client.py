@@ -0,0 +1,25 @@
+# Shared HTTP session for upstream APIs - keep-alive connections instead of a new TCP/TLS handshake per call
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.blocking import HTTP_THREADS
+
+# Transient upstream failures (rate limits, 5xx, dropped connections) are retried
+# with jittered exponential backoff (~0.5s, ~1s) and Retry-After honoured; other
+# 4xx fail at once. POSTs (Overpass) are never retried.
+_retries = Retry(
+    total=2,
+    backoff_factor=0.5,
+    backoff_jitter=0.25,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+# One connection pool per upstream host, sized to the threads that may call it at once
+http = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=HTTP_THREADS, max_retries=_retries)
+http.mount("https://", _adapter)
+http.mount("http://", _adapter)
@@ -0,0 +1,49 @@
+# Back-pressure for Gemini-backed endpoints - bounded in-flight AI requests per worker
+import asyncio
+import logging
+import os
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# AI requests served at once per worker, and how many may queue behind them
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_WAITING = int(os.getenv("LLM_MAX_WAITING", "32"))
+LLM_RETRY_AFTER_SECONDS = 5
+
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_waiting = 0
+
+
+async def llm_capacity():
+    """
+    FastAPI dependency that holds one AI slot for the duration of a request
+
+    Requests queue for a free slot while the queue is short; once
+    LLM_MAX_WAITING requests are already waiting, new ones fail fast with a
+    503 and Retry-After instead of piling up behind slow model calls. Login,
+    signup and the data endpoints never take a slot, so they are unaffected.
+
+    Raises:
+        HTTPException: 503 when the AI queue is full
+    """
+    global _waiting
+    if _llm_slots.locked() and _waiting >= LLM_MAX_WAITING:
+        logger.warning("AI capacity exhausted - rejecting request (%d waiting)", _waiting)
+        raise HTTPException(
+            status_code=503,
+            detail="AI assistant is busy, please retry shortly",
+            headers={"Retry-After": str(LLM_RETRY_AFTER_SECONDS)}
+        )
+
+    _waiting += 1
+    try:
+        await _llm_slots.acquire()
+    finally:
+        _waiting -= 1
+
+    try:
+        yield
+    finally:
+        _llm_slots.release()
@@ -1,4 +1,8 @@
+import logging
 import requests
+from utils.http_client import http
+
+logger = logging.getLogger(__name__)
 
 def find_nearby_clinics(lat: float, lon: float):
     """
@@ -12,7 +16,7 @@ def find_nearby_clinics(lat: float, lon: float):
     Returns:
         list: List of nearby clinics with name, coordinates, and address
     """
-    print("Clinic search started...")
+    logger.debug("Clinic search started...")
     
     # Create search bounding box around user location (approximately 5km radius)
     # Viewbox format: left,top,right,bottom (longitude,latitude,longitude,latitude)
@@ -40,7 +44,7 @@ def find_nearby_clinics(lat: float, lon: float):
     
     try:
         # Make HTTP request to Nominatim API
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = http.get(url, params=params, headers=headers, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -56,12 +60,12 @@ def find_nearby_clinics(lat: float, lon: float):
             }
             clinics.append(clinic)
         
-        print(f"Clinics found: {len(clinics)}")
+        logger.debug("Clinics found: %s", len(clinics))
         return clinics
         
     except requests.exceptions.RequestException as e:
-        print(f"Clinic API error: {str(e)}")
+        logger.error("Clinic API error: %s", e)
         return []
     except (ValueError, KeyError) as e:
-        print(f"Clinic API error: Invalid response format - {str(e)}")
+        logger.error("Clinic API error: Invalid response format - %s", e)
         return []
@@ -1,8 +1,12 @@
+import logging
 import requests
+from .http_client import http
 import math
 import os
 from typing import Tuple, Optional
 
+logger = logging.getLogger(__name__)
+
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate the great circle distance between two points on Earth using Haversine formula
@@ -58,9 +62,9 @@ def get_osrm_distance(start_lat: float, start_lon: float, end_lat: float, end_lo
     }
     
     try:
-        print(f"OSRM: Calculating route from ({start_lat}, {start_lon}) to ({end_lat}, {end_lon})")
+        logger.debug("OSRM: Calculating route from (%s, %s) to (%s, %s)", start_lat, start_lon, end_lat, end_lon)
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http.get(url, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -71,20 +75,20 @@ def get_osrm_distance(start_lat: float, start_lon: float, end_lat: float, end_lo
             distance_meters = data["routes"][0]["distance"]
             distance_km = distance_meters / 1000.0
             
-            print(f"OSRM: Route distance = {distance_km:.1f} km")
+            logger.debug("OSRM: Route distance = %.1f km", distance_km)
             return round(distance_km, 1)
         else:
-            print(f"OSRM: No route found - {data.get('message', 'Unknown error')}")
+            logger.warning("OSRM: No route found - %s", data.get('message', 'Unknown error'))
             return None
             
     except requests.exceptions.RequestException as e:
-        print(f"OSRM: Network error - {str(e)}")
+        logger.error("OSRM: Network error - %s", e)
         return None
     except (KeyError, ValueError, TypeError) as e:
-        print(f"OSRM: Response parsing error - {str(e)}")
+        logger.error("OSRM: Response parsing error - %s", e)
         return None
     except Exception as e:
-        print(f"OSRM: Unexpected error - {str(e)}")
+        logger.error("OSRM: Unexpected error - %s", e)
         return None
 
 def calculate_distance(start_lat: float, start_lon: float, end_lat: float, end_lon: float) -> float:
@@ -109,6 +113,6 @@ def calculate_distance(start_lat: float, start_lon: float, end_lat: float, end_l
         return osrm_distance
     
     # Fallback to Haversine straight-line distance
-    print("OSRM failed, using Haversine fallback")
+    logger.warning("OSRM failed, using Haversine fallback")
     haversine_dist = haversine_distance(start_lat, start_lon, end_lat, end_lon)
     return round(haversine_dist, 1)
\ No newline at end of file
@@ -1,6 +1,13 @@
+import logging
 import requests
+from utils.http_client import http
 import json
+from utils.ttl_cache import location_ttl_cache
 
+logger = logging.getLogger(__name__)
+
+# Facilities rarely change - an hour per location is plenty fresh
+@location_ttl_cache(ttl=3600)
 def find_medical_places(lat: float, lon: float):
     """
     Find nearby medical facilities using Overpass API based on GPS coordinates
@@ -16,7 +23,7 @@ def find_medical_places(lat: float, lon: float):
     Returns:
         list: List of medical facilities with name, coordinates, type, and address
     """
-    print(f"Overpass API search started for coordinates: {lat}, {lon}")
+    logger.debug("Overpass API search started for coordinates: %s, %s", lat, lon)
     
     # Overpass API endpoint - this is the main server that processes our queries
     overpass_url = "https://overpass-api.de/api/interpreter"
@@ -45,13 +52,13 @@ def find_medical_places(lat: float, lon: float):
     # - amenity filters: clinic=medical clinics, hospital=hospitals, pharmacy=pharmacies
     # - out center meta = return center coordinates and metadata for ways/areas
     
-    print("Overpass query built - searching within 1500m radius")
-    print("Searching for: clinics, hospitals, pharmacies")
+    logger.debug("Overpass query built - searching within 1500m radius")
+    logger.debug("Searching for: clinics, hospitals, pharmacies")
     
     try:
         # Send POST request to Overpass API with our query
         # Overpass API expects the query as raw text in the request body
-        response = requests.post(
+        response = http.post(
             overpass_url,
             data=overpass_query,
             headers={'Content-Type': 'text/plain'},
@@ -62,7 +69,7 @@ def find_medical_places(lat: float, lon: float):
         # Parse JSON response from Overpass API
         data = response.json()
         
-        print(f"Overpass API returned {len(data.get('elements', []))} raw results")
+        logger.debug("Overpass API returned %s raw results", len(data.get('elements', [])))
         
         # Process and clean the raw Overpass response
         medical_places = []
@@ -112,15 +119,15 @@ def find_medical_places(lat: float, lon: float):
             
             medical_places.append(facility)
         
-        print(f"Processed {len(medical_places)} medical facilities successfully")
+        logger.debug("Processed %s medical facilities successfully", len(medical_places))
         return medical_places
         
     except requests.exceptions.RequestException as e:
-        print(f"Overpass API request error: {str(e)}")
+        logger.error("Overpass API request error: %s", e)
         return []
     except json.JSONDecodeError as e:
-        print(f"Overpass API response parsing error: {str(e)}")
+        logger.error("Overpass API response parsing error: %s", e)
         return []
     except Exception as e:
-        print(f"Overpass API unexpected error: {str(e)}")
+        logger.error("Overpass API unexpected error: %s", e)
         return []
\ No newline at end of file
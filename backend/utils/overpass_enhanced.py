@@ -1,7 +1,46 @@
+import logging
 import requests
+from .http_client import http
 import json
 from typing import List, Dict, Any
-from .osrm_distance import calculate_distance
+from .osrm_distance import calculate_distance, haversine_distance
+from .ttl_cache import location_ttl_cache
+
+logger = logging.getLogger(__name__)
+
+# Raw OSM elements are cached for an hour per ~100 m cell (3 decimals) and radius;
+# distances are always computed from the caller's exact position
+@location_ttl_cache(ttl=3600, precision=3)
+def _fetch_overpass_elements(lat: float, lon: float, radius_meters: int) -> List[Dict[str, Any]]:
+    """Query Overpass for hospitals, clinics and pharmacies around a point"""
+    # Overpass API endpoint
+    overpass_url = "https://overpass-api.de/api/interpreter"
+    
+    # Simplified Overpass query for speed - only essential facility types
+    overpass_query = f"""
+    [out:json][timeout:15];
+    (
+      node["amenity"="hospital"](around:{radius_meters},{lat},{lon});
+      node["amenity"="clinic"](around:{radius_meters},{lat},{lon});
+      node["amenity"="pharmacy"](around:{radius_meters},{lat},{lon});
+      way["amenity"="hospital"](around:{radius_meters},{lat},{lon});
+      way["amenity"="clinic"](around:{radius_meters},{lat},{lon});
+    );
+    out center;
+    """
+    
+    logger.debug("Overpass: Sending query to OpenStreetMap...")
+    
+    response = http.post(
+        overpass_url,
+        data=overpass_query,
+        headers={'Content-Type': 'text/plain'},
+        timeout=20
+    )
+    response.raise_for_status()
+    
+    data = response.json()
+    return data.get('elements', [])
 
 def find_nearby_facilities(lat: float, lon: float, radius_km: float = 2.5) -> Dict[str, Any]:
     """
@@ -21,42 +60,15 @@ def find_nearby_facilities(lat: float, lon: float, radius_km: float = 2.5) -> Di
     # Allow up to 5km for fallback searches
     radius_km = min(radius_km, 5.0)
     
-    print(f"Fast Overpass: Searching for facilities within {radius_km}km of ({lat}, {lon})")
+    logger.debug("Fast Overpass: Searching for facilities within %skm of (%s, %s)", radius_km, lat, lon)
     
     # Convert radius from km to meters for Overpass API
     radius_meters = int(radius_km * 1000)
     
-    # Overpass API endpoint
-    overpass_url = "https://overpass-api.de/api/interpreter"
-    
-    # Simplified Overpass query for speed - only essential facility types
-    overpass_query = f"""
-    [out:json][timeout:15];
-    (
-      node["amenity"="hospital"](around:{radius_meters},{lat},{lon});
-      node["amenity"="clinic"](around:{radius_meters},{lat},{lon});
-      node["amenity"="pharmacy"](around:{radius_meters},{lat},{lon});
-      way["amenity"="hospital"](around:{radius_meters},{lat},{lon});
-      way["amenity"="clinic"](around:{radius_meters},{lat},{lon});
-    );
-    out center;
-    """
-    
     try:
-        print("Overpass: Sending query to OpenStreetMap...")
-        
-        response = requests.post(
-            overpass_url,
-            data=overpass_query,
-            headers={'Content-Type': 'text/plain'},
-            timeout=20
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        elements = data.get('elements', [])
+        elements = _fetch_overpass_elements(lat, lon, radius_meters)
         
-        print(f"Overpass: Found {len(elements)} raw facilities")
+        logger.debug("Overpass: Found %s raw facilities", len(elements))
         
         # Process facilities with haversine distance only (fast)
         facilities = []
@@ -73,13 +85,13 @@ def find_nearby_facilities(lat: float, lon: float, radius_km: float = 2.5) -> Di
                     if len(facilities) >= 40:
                         break
             except Exception as e:
-                print(f"Error processing facility: {e}")
+                logger.warning("Error processing facility: %s", e)
                 continue
         
         # Sort by distance (nearest first)
         facilities.sort(key=lambda x: x['distance_km'])
         
-        print(f"Fast Overpass: Processed {len(facilities)} facilities in {radius_km}km")
+        logger.debug("Fast Overpass: Processed %s facilities in %skm", len(facilities), radius_km)
         
         return {
             "user_location": {"lat": lat, "lon": lon},
@@ -88,14 +100,14 @@ def find_nearby_facilities(lat: float, lon: float, radius_km: float = 2.5) -> Di
         }
         
     except requests.exceptions.RequestException as e:
-        print(f"Overpass API error: {e}")
+        logger.error("Overpass API error: %s", e)
         return {
             "user_location": {"lat": lat, "lon": lon},
             "radius_km": radius_km,
             "facilities": []
         }
     except Exception as e:
-        print(f"Unexpected error in find_nearby_facilities: {e}")
+        logger.error("Unexpected error in find_nearby_facilities: %s", e)
         return {
             "user_location": {"lat": lat, "lon": lon},
             "radius_km": radius_km,
@@ -142,7 +154,6 @@ def process_facility_element_fast(element: Dict[str, Any], user_lat: float, user
     address = build_simple_address(tags)
     
     # Fast haversine distance only
-    from .osrm_distance import haversine_distance
     distance_km = haversine_distance(user_lat, user_lon, facility_lat, facility_lon)
     
     return {
@@ -0,0 +1,18 @@
+# Password hashing - bcrypt, with a fallback for accounts stored before hashing
+import hmac
+
+import bcrypt
+
+
+def hash_password(password: str) -> bytes:
+    """bcrypt hash of a password, salted; deliberately slow, so call it off the event loop"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+
+
+def check_password(password: str, user: dict) -> bool:
+    """Verify against the bcrypt hash, or the plaintext password of accounts created before hashing"""
+    if user.get("password_hash"):
+        return bcrypt.checkpw(password.encode(), user["password_hash"])
+    stored = user.get("password")
+    # Constant-time comparison, so response timing doesn't leak the password
+    return stored is not None and hmac.compare_digest(stored.encode(), password.encode())
@@ -0,0 +1,12 @@
+# App-wide JSON response class - orjson encoding with a fallback for Mongo types
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+class APIResponse(ORJSONResponse):
+    """ORJSONResponse that encodes anything orjson can't (e.g. ObjectId) as a string"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
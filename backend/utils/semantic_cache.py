@@ -0,0 +1,140 @@
+# Semantic response cache - serves near-duplicate LLM prompts from memory
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.cache_keys import cache_key
+
+logger = logging.getLogger(__name__)
+
+Embedding = np.ndarray
+
+
+def _normalize(vector: List[float]) -> Optional[Embedding]:
+    """Scale a vector to unit length so cosine similarity becomes a dot product"""
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if not norm:
+        return None
+    return array / norm
+
+
+def _default_embedder() -> Optional[Callable[[str], List[float]]]:
+    """Build the Gemini embedding function, or None when no API key is configured"""
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return None
+
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    embeddings = GoogleGenerativeAIEmbeddings(
+        model="models/text-embedding-004",
+        google_api_key=api_key,
+    )
+    return embeddings.embed_query
+
+
+class SemanticCache:
+    """
+    In-process semantic cache for LLM completions
+
+    Responses are stored per namespace alongside the embedding of the prompt
+    that produced them. A new prompt is served from cache when it is an exact
+    (normalized) repeat, or when its embedding has cosine similarity above
+    `threshold` with a stored one.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 256,
+        ttl_seconds: int = 3600,
+        embedder: Optional[Callable[[str], List[float]]] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._embedder = embedder
+        self._embedder_loaded = embedder is not None
+        self._entries: Dict[Hashable, "OrderedDict[str, Tuple[float, Optional[Embedding], str]]"] = {}
+        self._lock = threading.Lock()
+
+    def _get_embedder(self) -> Optional[Callable[[str], List[float]]]:
+        if not self._embedder_loaded:
+            self._embedder_loaded = True
+            try:
+                self._embedder = _default_embedder()
+            except Exception as e:
+                logger.warning("Semantic cache embedder unavailable: %s", e)
+                self._embedder = None
+        return self._embedder
+
+    def embed(self, text: str) -> Optional[Embedding]:
+        """Embed normalized text; returns None if embeddings are unavailable"""
+        embedder = self._get_embedder()
+        if embedder is None:
+            return None
+        try:
+            return _normalize(embedder(text))
+        except Exception as e:
+            logger.warning("Semantic cache embedding failed: %s", e)
+            return None
+
+    def lookup_exact(self, namespace: Hashable, text: str) -> Optional[str]:
+        """Return a cached response for an exact repeat of `text`, without embedding"""
+        key = cache_key(text)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._entries.get(namespace)
+            if not bucket or key not in bucket:
+                return None
+            stored_at, _, response = bucket[key]
+            if now - stored_at > self.ttl_seconds:
+                del bucket[key]
+                return None
+            bucket.move_to_end(key)
+            return response
+
+    def lookup(self, namespace: Hashable, embedding: Optional[Embedding]) -> Optional[str]:
+        """Return the most similar cached response above the threshold, if any"""
+        if embedding is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._entries.get(namespace)
+            if not bucket:
+                return None
+            keys, vectors = [], []
+            for key, (stored_at, stored_embedding, _) in list(bucket.items()):
+                if now - stored_at > self.ttl_seconds:
+                    del bucket[key]
+                    continue
+                if stored_embedding is not None:
+                    keys.append(key)
+                    vectors.append(stored_embedding)
+            if not keys:
+                return None
+            # One matrix-vector product scores every stored prompt at once
+            scores = np.stack(vectors) @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            best_key = keys[best]
+            bucket.move_to_end(best_key)
+            return bucket[best_key][2]
+
+    def update(self, namespace: Hashable, text: str, embedding: Optional[Embedding], response: str):
+        """Store a freshly generated response, evicting the least recently used entry"""
+        key = cache_key(text)
+        with self._lock:
+            bucket = self._entries.setdefault(namespace, OrderedDict())
+            bucket[key] = (time.monotonic(), embedding, response)
+            bucket.move_to_end(key)
+            while len(bucket) > self.max_entries:
+                bucket.popitem(last=False)
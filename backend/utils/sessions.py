@@ -0,0 +1,73 @@
+# Session tokens - short-lived JWTs issued at login, verified once per TTL window
+import hashlib
+import logging
+import os
+import secrets
+import time
+
+import jwt
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+logger = logging.getLogger(__name__)
+
+JWT_ALGORITHM = "HS256"
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "900"))
+
+_secret = os.getenv("JWT_SECRET")
+if not _secret:
+    # A per-process secret only verifies tokens issued by the same worker, so it
+    # is limited to single-process runs (uvicorn takes --workers from WEB_CONCURRENCY;
+    # gunicorn_conf.py refuses to start without JWT_SECRET)
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("JWT_SECRET must be set when running more than one worker")
+    logger.warning("JWT_SECRET not set - using a per-process secret (single worker only)")
+    _secret = secrets.token_urlsafe(32)
+
+# sha256(token) -> verified payload; a hit skips signature verification entirely.
+# Keyed by digest so the cache never holds usable bearer tokens
+_verified_tokens = TTLCache(maxsize=10_000, ttl=30)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def issue_token(email: str, role: str) -> str:
+    """Signed session token for a user who just logged in"""
+    return jwt.encode(
+        {"sub": email, "role": role, "exp": int(time.time()) + SESSION_TTL_SECONDS},
+        _secret,
+        algorithm=JWT_ALGORITHM
+    )
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+async def current_user(creds: HTTPAuthorizationCredentials = Depends(_bearer)) -> dict:
+    """
+    FastAPI dependency returning the caller's session ({"sub", "role", "exp"})
+
+    Raises:
+        HTTPException: 401 when the bearer token is missing, invalid or expired
+    """
+    if creds is None:
+        raise _unauthorized("Not authenticated")
+
+    token = creds.credentials
+    token_key = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(token_key)
+    # A cached payload can outlive its token by up to the cache TTL, so exp is rechecked
+    if payload is not None and payload["exp"] > time.time():
+        return payload
+
+    try:
+        payload = jwt.decode(token, _secret, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise _unauthorized("Session expired")
+    except jwt.InvalidTokenError:
+        raise _unauthorized("Invalid session token")
+
+    _verified_tokens[token_key] = payload
+    return payload
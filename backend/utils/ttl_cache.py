@@ -0,0 +1,188 @@
+# TTL cache for location-keyed API lookups - weather and AQI change on a 10+ minute cadence
+import contextlib
+import copy
+import functools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Redis key prefix for the tier shared by all workers; see _shared_store
+SHARED_KEY_PREFIX = "loc:"
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_store():
+    """Redis client shared by every worker and instance when REDIS_URL is set, else None"""
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url:
+        return None
+    # Imported lazily, as in config.llm_cache - single-process setups don't need it
+    from redis import Redis
+    # Short timeouts: a slow Redis must never cost more than the API call it saves
+    return Redis.from_url(redis_url, socket_connect_timeout=0.25, socket_timeout=0.25)
+
+
+def _encode_shared(value: Any) -> bytes:
+    """`<wall-clock fetch time>|<b for bytes, j for JSON><payload>`"""
+    header = f"{time.time():.3f}|".encode()
+    if isinstance(value, bytes):
+        return header + b"b" + value
+    return header + b"j" + orjson.dumps(value)
+
+
+def _decode_shared(raw: bytes) -> Tuple[Any, float]:
+    """(value, age in seconds) from an _encode_shared() payload"""
+    fetched, _, body = raw.partition(b"|")
+    value = body[1:] if body[:1] == b"b" else orjson.loads(body[1:])
+    return value, max(time.time() - float(fetched), 0.0)
+
+
+def location_ttl_cache(ttl: int = 600, maxsize: int = 1024, refresh_ratio: float = 0.8, precision: int = 2,
+                       negative_ttl: int = 30):
+    """
+    Cache a `fn(lat, lon, *args)` lookup per rounded location for `ttl` seconds
+
+    - Coordinates are snapped to `precision` decimals (~1 km at 2) and the
+      lookup itself is made with the snapped values, so nearby callers share
+      an entry and the upstream request URL is identical for the whole cell
+      (any HTTP cache in between sees the same key); extra positional args
+      are part of the key.
+    - A per-key lock lets only one caller fetch a missing entry; concurrent
+      callers for the same location wait for it instead of stampeding the API.
+    - Once an entry is older than `refresh_ratio * ttl` it is still served,
+      and a background thread refreshes it (stale-while-revalidate).
+    - Empty results (None / {}) are only remembered for `negative_ttl` seconds:
+      failures are retried soon, but while an upstream API is down requests
+      get the empty result at once instead of each waiting out a timeout.
+    - Callers get a shallow copy, so mutating the result never touches the cache.
+    - With REDIS_URL set, fetched values are also written to Redis, and a
+      worker missing an entry takes a fresh-enough Redis copy instead of
+      calling the API itself, so N workers make one upstream call per
+      location and TTL rather than N. Redis errors fall through to the API.
+
+    Args:
+        ttl: Seconds an entry stays valid
+        maxsize: Maximum number of cached locations
+        refresh_ratio: Fraction of ttl after which a background refresh starts
+        precision: Decimal places used to round lat/lon for the cache key
+        negative_ttl: Seconds an empty result is served before retrying (0 disables)
+
+    Returns:
+        Callable: Decorator for `fn(lat, lon, *args)`
+    """
+    def decorator(fn: Callable[..., Any]):
+        entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        failures: TTLCache = TTLCache(maxsize=maxsize, ttl=max(negative_ttl, 1))
+        entries_lock = threading.Lock()
+        # key -> [lock, callers holding or waiting for it]; only in-flight keys have one
+        key_locks: Dict[Tuple, list] = {}
+        refreshing = set()
+        shared_prefix = f"{SHARED_KEY_PREFIX}{fn.__module__}.{fn.__name__}:"
+
+        def _shared_key(key) -> str:
+            return shared_prefix + ":".join(map(str, key))
+
+        def _load_shared(key) -> Optional[Tuple[Any, float]]:
+            store = _shared_store()
+            if store is None:
+                return None
+            try:
+                raw = store.get(_shared_key(key))
+                return _decode_shared(raw) if raw else None
+            except Exception as e:
+                logger.warning("Shared cache read for %s%s failed: %s", fn.__name__, key, e)
+                return None
+
+        def _save_shared(key, value):
+            store = _shared_store()
+            if store is None:
+                return
+            try:
+                store.set(_shared_key(key), _encode_shared(value), ex=ttl)
+            except Exception as e:
+                logger.warning("Shared cache write for %s%s failed: %s", fn.__name__, key, e)
+
+        @contextlib.contextmanager
+        def _key_lock(key):
+            """Hold the fetch lock for key; it is dropped once no caller holds or awaits it"""
+            with entries_lock:
+                slot = key_locks.setdefault(key, [threading.Lock(), 0])
+                slot[1] += 1
+            try:
+                with slot[0]:
+                    yield
+            finally:
+                with entries_lock:
+                    slot[1] -= 1
+                    if not slot[1]:
+                        del key_locks[key]
+
+        def _get(key):
+            with entries_lock:
+                return entries.get(key)
+
+        def _fetch(key):
+            # Another worker's copy is used while it is younger than the refresh point
+            shared = _load_shared(key)
+            if shared is not None and shared[1] < ttl * refresh_ratio:
+                value, age = shared
+                fetched_at = time.monotonic() - age
+            else:
+                # The key is (snapped lat, snapped lon, *args) - exactly the call to make
+                value = fn(*key)
+                fetched_at = time.monotonic()
+                if value:
+                    _save_shared(key, value)
+            with entries_lock:
+                if value:
+                    entries[key] = (value, fetched_at)
+                    failures.pop(key, None)
+                elif negative_ttl:
+                    failures[key] = value
+            return value
+
+        def _refresh(key):
+            try:
+                _fetch(key)
+            except Exception as e:
+                logger.warning("Background refresh of %s%s failed: %s", fn.__name__, key, e)
+            finally:
+                with entries_lock:
+                    refreshing.discard(key)
+
+        @functools.wraps(fn)
+        def wrapper(lat: float, lon: float, *args):
+            key = (round(lat, precision), round(lon, precision), *args)
+
+            cached = _get(key)
+            if cached is None:
+                with _key_lock(key):
+                    # Another caller may have filled the entry while we waited
+                    cached = _get(key)
+                    if cached is None:
+                        with entries_lock:
+                            if key in failures:
+                                return copy.copy(failures[key])
+                        return copy.copy(_fetch(key))
+
+            value, fetched_at = cached
+            if time.monotonic() - fetched_at >= ttl * refresh_ratio:
+                with entries_lock:
+                    start_refresh = key not in refreshing
+                    refreshing.add(key)
+                if start_refresh:
+                    threading.Thread(target=_refresh, args=(key,), daemon=True).start()
+
+            return copy.copy(value)
+
+        wrapper.cache = entries
+        return wrapper
+
+    return decorator
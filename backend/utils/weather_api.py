@@ -1,9 +1,15 @@
+import logging
 import requests
+from utils.http_client import http
 import os
 from dotenv import load_dotenv
+from utils.ttl_cache import location_ttl_cache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+@location_ttl_cache(ttl=600)
 def get_weather(lat: float, lon: float):
     """
     Fetch weather data using GPS coordinates (latitude & longitude)
@@ -16,12 +22,12 @@ def get_weather(lat: float, lon: float):
     Returns:
         dict: Weather data with temperature, humidity, description
     """
-    print("Weather API call started")
+    logger.debug("Weather API call started")
     
     # Get API key from environment variables
     api_key = os.getenv("OPENWEATHER_API_KEY")
     if not api_key:
-        print("Weather error: Missing API key")
+        logger.error("Weather error: Missing API key")
         return None
     
     # Build OpenWeatherMap API URL with coordinates
@@ -30,7 +36,7 @@ def get_weather(lat: float, lon: float):
     
     try:
         # Make HTTP request to OpenWeatherMap
-        response = requests.get(url, timeout=10)
+        response = http.get(url, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -42,12 +48,39 @@ def get_weather(lat: float, lon: float):
             "description": data["weather"][0]["description"]
         }
         
-        print("Weather fetched successfully")
+        logger.debug("Weather fetched successfully")
         return weather_data
         
     except requests.exceptions.RequestException as e:
-        print(f"Weather error: {str(e)}")
+        logger.error("Weather error: %s", e)
         return None
     except KeyError as e:
-        print(f"Weather error: Invalid response format - {str(e)}")
-        return None
\ No newline at end of file
+        logger.error("Weather error: Invalid response format - %s", e)
+        return None
+# Place names don't change - a day per location is plenty fresh
+@location_ttl_cache(ttl=86400)
+def reverse_geocode(lat: float, lon: float):
+    """
+    Find the city name for GPS coordinates using OpenWeatherMap reverse geocoding
+    
+    Args:
+        lat: Latitude coordinate (float)
+        lon: Longitude coordinate (float)
+    
+    Returns:
+        str: City name, or None if it could not be resolved
+    """
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    if not api_key:
+        return None
+    
+    url = f"https://api.openweathermap.org/geo/1.0/reverse?lat={lat}&lon={lon}&limit=1&appid={api_key}"
+    
+    try:
+        response = http.get(url, timeout=5)
+        response.raise_for_status()
+        places = response.json()
+        return places[0].get("name") if places else None
+    except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+        logger.warning("Reverse geocoding error: %s", e)
+        return None
@@ -1,8 +1,13 @@
+import logging
 from dotenv import load_dotenv
 import os
 import requests
+from utils.http_client import http
+from utils.blocking import run_http
 import json
-from typing import Optional, Dict, Any
+from bisect import bisect_left
+from typing import Optional, Dict, Any, Tuple
+from utils.ttl_cache import location_ttl_cache
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
@@ -10,9 +15,11 @@ from langchain_core.output_parsers import StrOutputParser
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
-    print("Warning: GOOGLE_API_KEY not found in .env - chatbot features disabled")
+    logger.warning("GOOGLE_API_KEY not found in .env - chatbot features disabled")
     GOOGLE_API_KEY = None
 
 llm = None
@@ -27,7 +34,7 @@ if GOOGLE_API_KEY:
 
 def get_user_location() -> Optional[Dict[str, Any]]:
     try:
-        resp = requests.get("https://ipapi.co/json/", timeout=10)
+        resp = http.get("https://ipapi.co/json/", timeout=10)
         resp.raise_for_status()
         data = resp.json()
         return {
@@ -36,13 +43,13 @@ def get_user_location() -> Optional[Dict[str, Any]]:
             "lon": data.get("longitude"),
         }
     except Exception as e:
-        print("Location lookup failed:", e)
+        logger.warning("Location lookup failed: %s", e)
         return None
 
 def geocode_city(city: str) -> Optional[Dict[str, Any]]:
     url = "https://geocoding-api.open-meteo.com/v1/search"
     params = {"name": city, "count": 1, "language": "en", "format": "json"}
-    resp = requests.get(url, params=params, timeout=10)
+    resp = http.get(url, params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
     results = data.get("results") or []
@@ -55,6 +62,7 @@ def geocode_city(city: str) -> Optional[Dict[str, Any]]:
         "lon": best.get("longitude"),
     }
 
+@location_ttl_cache(ttl=600)
 def get_weather(lat: float, lon: float) -> Dict[str, Any]:
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
@@ -63,10 +71,11 @@ def get_weather(lat: float, lon: float) -> Dict[str, Any]:
         "current": "temperature_2m",
         "timezone": "auto",
     }
-    resp = requests.get(url, params=params, timeout=10)
+    resp = http.get(url, params=params, timeout=10)
     resp.raise_for_status()
     return resp.json().get("current", {})
 
+@location_ttl_cache(ttl=600)
 def get_air_quality(lat: float, lon: float) -> Dict[str, Any]:
     url = "https://air-quality-api.open-meteo.com/v1/air-quality"
     params = {
@@ -75,23 +84,45 @@ def get_air_quality(lat: float, lon: float) -> Dict[str, Any]:
         "current": "us_aqi,european_aqi",
         "timezone": "auto",
     }
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    return resp.json().get("current", {})
+    # Failures return {} (never cached) so callers fall back without a try/except
+    try:
+        resp = http.get(url, params=params, timeout=10)
+        resp.raise_for_status()
+        return resp.json().get("current", {})
+    except (requests.RequestException, ValueError) as e:
+        logger.warning("Air quality lookup failed: %s", e)
+        return {}
+
+# US EPA AQI bands: upper bound (inclusive) of each band, and its category
+AQI_US_BREAKPOINTS = (50, 100, 150, 200, 300)
+AQI_US_CATEGORIES = (
+    "Good",
+    "Moderate",
+    "Unhealthy for Sensitive Groups",
+    "Unhealthy",
+    "Very Unhealthy",
+    "Hazardous",
+)
 
 def classify_aqi_us(aqi: float) -> str:
-    if aqi <= 50:
-        return "Good"
-    elif aqi <= 100:
-        return "Moderate"
-    elif aqi <= 150:
-        return "Unhealthy for Sensitive Groups"
-    elif aqi <= 200:
-        return "Unhealthy"
-    elif aqi <= 300:
-        return "Very Unhealthy"
-    else:
-        return "Hazardous"
+    # bisect_left puts a value equal to a breakpoint in the lower band,
+    # matching the inclusive "<=" ladder
+    return AQI_US_CATEGORIES[bisect_left(AQI_US_BREAKPOINTS, aqi)]
+
+def aqi_reading(aqi_data: Optional[Dict[str, Any]]) -> Tuple[float, str]:
+    """AQI value and US category from a get_air_quality() result, defaulting to 50 / Good"""
+    if not aqi_data:
+        return 50, "Good"
+    aqi_value = aqi_data.get("us_aqi") or aqi_data.get("european_aqi") or 50
+    return aqi_value, classify_aqi_us(aqi_value)
+
+async def fetch_aqi(lat: float, lon: float) -> Tuple[float, str]:
+    """Cached AQI lookup and classification in one await; never raises, defaults to 50 / Good"""
+    try:
+        return aqi_reading(await run_http(get_air_quality, lat, lon))
+    except Exception as e:
+        logger.warning("AQI reading failed: %s", e)
+        return 50, "Good"
 
 def line_for_location(name: str, lat: float, lon: float) -> str:
     weather = get_weather(lat, lon)
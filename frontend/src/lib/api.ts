@@ -4,6 +4,32 @@ export const api = axios.create({
   baseURL: import.meta.env.VITE_BACKEND_URL || "http://127.0.0.1:8000",
 });
 
+// Session token from /login, sent as a bearer token on every request
+export const AUTH_TOKEN_KEY = "authToken";
+
+api.interceptors.request.use((config) => {
+  const token = sessionStorage.getItem(AUTH_TOKEN_KEY);
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`;
+  }
+  return config;
+});
+
+// Sessions are short-lived and not refreshed - an expired or rejected token
+// sends the user back to log in instead of leaving the dashboard failing silently
+api.interceptors.response.use(
+  (response) => response,
+  (error) => {
+    if (error.response?.status === 401) {
+      sessionStorage.removeItem(AUTH_TOKEN_KEY);
+      if (window.location.pathname !== "/login") {
+        window.location.assign("/login");
+      }
+    }
+    return Promise.reject(error);
+  }
+);
+
 export const sendCitizenMessage = (message: string) =>
   api.post("/citizen-response", { message });
 
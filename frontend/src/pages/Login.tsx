@@ -6,7 +6,7 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { useToast } from "@/hooks/use-toast";
-import { login } from "@/lib/api";
+import { AUTH_TOKEN_KEY, login } from "@/lib/api";
 
 const demoAccounts = [
   {
@@ -64,6 +64,7 @@ export const Login = () => {
         const response = await login(email, password);
         
         if (response.data.success) {
+          sessionStorage.setItem(AUTH_TOKEN_KEY, response.data.token);
           toast({ title: "Welcome back!", description: "Redirecting..." });
           navigate(response.data.role === "citizen" ? "/citizen" : "/hospital");
         } else {
@@ -9,7 +9,7 @@ pip install -r requirements.txt
 
 # Start backend server in background
 echo "🔧 Starting FastAPI backend server..."
-uvicorn app:app --reload --host 127.0.0.1 --port 8000 &
+uvicorn app:app --reload --host 127.0.0.1 --port 8000 --loop uvloop --http httptools &
 BACKEND_PID=$!
 
 # Wait a moment for backend to start